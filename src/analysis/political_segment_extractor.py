@@ -0,0 +1,134 @@
+"""
+Scoring stage that finds political segments in full transcripts.
+
+Streams the stored transcript segments of every processed, not yet scanned video, runs the
+political keyword taxonomy over a sliding time window and bulk-inserts the resulting
+PoliticalSegment rows. Each video is committed together with its scan marker, so an
+interrupted run resumes with the first unscanned video.
+"""
+
+import os
+import sys
+import time
+import logging
+from itertools import groupby
+from collections import Counter
+from typing import Dict, Iterable, List
+
+# Add the parent directory to the path so we can import the database module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_manager import DatabaseManager
+from data_collection.keyword_matcher import KeywordMatcher, POLITICAL_KEYWORDS
+
+class PoliticalSegmentExtractor:
+    def __init__(self, db_manager: DatabaseManager, window_seconds: float = 60.0,
+                 step_seconds: float = 30.0, min_keyword_hits: int = 2):
+        """
+        A window of window_seconds, moved in steps of step_seconds, is political when it contains
+        at least min_keyword_hits keyword occurrences. Overlapping political windows are merged.
+        """
+        self.db = db_manager
+        self.step_seconds = step_seconds
+        self.window_steps = max(1, round(window_seconds / step_seconds))
+        self.min_keyword_hits = min_keyword_hits
+        self.matcher = KeywordMatcher(POLITICAL_KEYWORDS)
+        self.logger = logging.getLogger(__name__)
+
+    def extract_segments(self, segments: Iterable) -> List[Dict]:
+        """
+        Find the political segments in one video's transcript segments, ordered by start time.
+        Returns PoliticalSegment column dicts (without video_id).
+        """
+        # Group caption lines into step-sized buckets; each bucket's text is matched once
+        buckets = {}
+        for segment in segments:
+            index = int(segment.start_time // self.step_seconds)
+            bucket = buckets.setdefault(index, {
+                'start_time': segment.start_time,
+                'end_time': segment.start_time + segment.duration,
+                'texts': []
+            })
+            bucket['end_time'] = max(bucket['end_time'], segment.start_time + segment.duration)
+            bucket['texts'].append(segment.text)
+        if not buckets:
+            return []
+
+        first, last = min(buckets), max(buckets)
+        keyword_counts = {
+            index: self.matcher.match_keywords(' '.join(bucket['texts']))
+            for index, bucket in buckets.items()
+        }
+
+        hit_counts = {index: sum(counts.values()) for index, counts in keyword_counts.items()}
+
+        # Mark every bucket covered by a window with enough keyword hits
+        political = set()
+        for window_start in range(first, last + 1):
+            window = range(window_start, min(window_start + self.window_steps, last + 1))
+            hits = sum(hit_counts.get(index, 0) for index in window)
+            if hits >= self.min_keyword_hits:
+                political.update(index for index in window if index in buckets)
+
+        # Merge runs of consecutive political buckets into segments
+        results = []
+        run = []
+        for index in range(first, last + 2):
+            if index in political:
+                run.append(index)
+                continue
+            if run:
+                results.append(self._build_segment([buckets[i] for i in run], [keyword_counts[i] for i in run]))
+                run = []
+        return results
+
+    def _build_segment(self, buckets: List[Dict], keyword_counts: List[Counter]) -> Dict:
+        keywords = Counter()
+        for counts in keyword_counts:
+            keywords.update(counts)
+        categories = [
+            category for category, category_keywords in POLITICAL_KEYWORDS.items()
+            if any(keyword in keywords for keyword in category_keywords)
+        ]
+        return {
+            'segment_text': ' '.join(text for bucket in buckets for text in bucket['texts']),
+            'start_time': buckets[0]['start_time'],
+            'end_time': buckets[-1]['end_time'],
+            'keywords': sorted(keywords),
+            'political_categories': categories
+        }
+
+    def run(self, videos_per_batch: int = 100) -> Dict:
+        """
+        Scan every processed video that has not been scanned yet, in one streaming pass that
+        reads the transcripts of videos_per_batch videos at a time.
+        Returns counts of videos scanned and political segments written.
+        """
+        start = time.time()
+        videos_scanned = 0
+        segments_written = 0
+        rows = self.db.iter_unscanned_transcript_segments(videos_per_batch=videos_per_batch)
+        for video_id, video_segments in groupby(rows, key=lambda row: row.video_id):
+            political_segments = self.extract_segments(video_segments)
+            written = self.db.replace_political_segments(video_id, political_segments)
+            if written is None:
+                continue
+            videos_scanned += 1
+            segments_written += written
+            if videos_scanned % 100 == 0:
+                self.logger.info(f"Scanned {videos_scanned} videos, {segments_written} political segments so far")
+
+        elapsed = time.time() - start
+        self.logger.info(
+            f"Political segment scan finished: {videos_scanned} videos, "
+            f"{segments_written} political segments in {elapsed:.1f}s"
+        )
+        return {'videos_scanned': videos_scanned, 'political_segments': segments_written}
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = DatabaseManager()
+    db.init_db()
+    PoliticalSegmentExtractor(db).run()
+
+if __name__ == "__main__":
+    main()
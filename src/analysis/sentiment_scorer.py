@@ -0,0 +1,175 @@
+"""
+Sentiment scoring stage for political segments.
+
+Streams the PoliticalSegment rows that have no sentiment_score yet, scores them on CPU with a
+transformer sentiment classifier and writes the scores back with bulk UPDATEs, one chunk at a
+time, so an interrupted run resumes with the first unscored segment.
+
+Scores are cached in the sentiment_cache table by (model name, model version, sha1 of the
+normalized text): captions repeat a lot, and repeated runs or re-scoring with the same model
+only run inference on texts that have not been seen before.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+except ImportError:  # Only needed for scoring; the rest of the pipeline runs without them
+    torch = None
+
+# Add the parent directory to the path so we can import the database module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_manager import DatabaseManager
+
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+class SentimentScorer:
+    def __init__(self, db_manager: DatabaseManager, model_name: str = DEFAULT_MODEL,
+                 num_threads: Optional[int] = None, max_batch_tokens: int = 8192,
+                 max_batch_size: int = 64, max_length: int = 512, chunk_size: int = 4096,
+                 model_version: Optional[str] = None):
+        """
+        Segments are read chunk_size at a time. Within a chunk they are sorted by token length
+        and packed into batches of at most max_batch_size segments and max_batch_tokens padded
+        tokens, so short segments are not padded to the length of long ones. Texts longer than
+        max_length tokens are truncated. num_threads sets torch's intra-op thread count
+        (default: all cores). Cached scores are keyed on model_version, which defaults to the
+        model's hub commit hash.
+        """
+        if torch is None:
+            raise ImportError("torch and transformers are required for sentiment scoring")
+        self.db = db_manager
+        self.model_name = model_name
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_length = max_length
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+
+        torch.set_num_threads(num_threads or os.cpu_count() or 1)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        self.negative_index, self.positive_index = self._polarity_labels()
+        self.model_version = model_version or getattr(self.model.config, '_commit_hash', None) or 'unversioned'
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _polarity_labels(self):
+        """Find the negative and positive classes; unnamed labels are assumed to run negative to positive."""
+        labels = {index: label.lower() for index, label in self.model.config.id2label.items()}
+        negative = next((index for index, label in labels.items() if label.startswith('neg')), min(labels))
+        positive = next((index for index, label in labels.items() if label.startswith('pos')), max(labels))
+        return negative, positive
+
+    def _batches(self, order: List[int], lengths: List[int]) -> Iterator[List[int]]:
+        """Pack indices, sorted by ascending length, into batches within the size and token limits."""
+        batch = []
+        for index in order:
+            # The current item is the longest so far, so it sets the padded length
+            if batch and (len(batch) >= self.max_batch_size
+                          or (len(batch) + 1) * lengths[index] > self.max_batch_tokens):
+                yield batch
+                batch = []
+            batch.append(index)
+        if batch:
+            yield batch
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Cache key of a text: sha1 of the text lowercased with whitespace collapsed."""
+        return hashlib.sha1(' '.join(text.lower().split()).encode('utf-8')).hexdigest()
+
+    def score_texts(self, texts: List[str]) -> List[float]:
+        """
+        Score texts from -1 (negative) to 1 (positive): the positive minus the negative class probability.
+        Cached scores are looked up in bulk first; only texts missing from the cache are run
+        through the model, once per distinct normalized text, and their scores are cached.
+        Returns scores in the order of texts.
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        distinct = list(dict.fromkeys(hashes))
+        cached = self.db.get_cached_sentiments(self.model_name, self.model_version, distinct)
+        
+        missing = {text_hash: text for text_hash, text in zip(hashes, texts) if text_hash not in cached}
+        self.cache_hits += len(texts) - len(missing)
+        self.cache_misses += len(missing)
+        if missing:
+            scores = dict(zip(missing, self._infer(list(missing.values()))))
+            self.db.save_cached_sentiments(self.model_name, self.model_version, scores)
+            cached.update(scores)
+        return [cached[text_hash] for text_hash in hashes]
+
+    def _infer(self, texts: List[str]) -> List[float]:
+        """Run the model over texts in length-sorted dynamic batches. Returns scores in the order of texts."""
+        input_ids = self.tokenizer(texts, truncation=True, max_length=self.max_length)['input_ids']
+        lengths = [len(ids) for ids in input_ids]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+        scores = [0.0] * len(texts)
+        for batch in self._batches(order, lengths):
+            inputs = self.tokenizer.pad({'input_ids': [input_ids[i] for i in batch]}, return_tensors='pt')
+            with torch.inference_mode():
+                probabilities = self.model(**inputs).logits.softmax(dim=-1)
+            polarity = probabilities[:, self.positive_index] - probabilities[:, self.negative_index]
+            for index, score in zip(batch, polarity.tolist()):
+                scores[index] = score
+        return scores
+
+    def run(self, batch_size: int = 10000) -> Dict:
+        """
+        Score every political segment that has no sentiment score yet.
+        Returns the number of segments scored.
+        """
+        start = time.time()
+        segments_scored = 0
+        rows = self.db.iter_unscored_political_segments(batch_size=batch_size)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            scores = self.score_texts([row.segment_text for row in chunk])
+            segments_scored += self.db.update_sentiment_scores([
+                {'id': row.id, 'sentiment_score': score}
+                for row, score in zip(chunk, scores)
+            ])
+            elapsed = time.time() - start
+            self.logger.info(
+                f"Scored {segments_scored} segments ({segments_scored / elapsed:.1f} segments/s, "
+                f"cache hit rate {self.cache_hit_rate():.0%})"
+            )
+
+        elapsed = time.time() - start
+        rate = segments_scored / elapsed if elapsed else 0.0
+        self.logger.info(
+            f"Sentiment scoring finished: {segments_scored} segments in {elapsed:.1f}s ({rate:.1f} segments/s); "
+            f"cache: {self.cache_hits} hits, {self.cache_misses} misses ({self.cache_hit_rate():.0%} hit rate)"
+        )
+        return {
+            'segments_scored': segments_scored,
+            'segments_per_second': rate,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hit_rate()
+        }
+
+    def cache_hit_rate(self) -> float:
+        """Share of scored texts answered from the cache (a text repeated within a batch counts as a hit)."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+def main(num_threads: Optional[int] = None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = DatabaseManager()
+    db.init_db()
+    SentimentScorer(db, num_threads=num_threads).run()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,350 @@
+"""
+Text preprocessing stage that turns raw auto-caption lines into clean, sentence-level utterances.
+
+Streams the stored transcript segments of every processed, not yet preprocessed video through a
+generator pipeline (clean caption lines, split them at sentence ends, merge the pieces into
+utterances) and bulk-inserts the resulting Utterance rows. Each video is committed together
+with its preprocessing marker, so an interrupted run resumes with the first unprocessed video.
+"""
+
+import os
+import re
+import sys
+import time
+import queue
+import logging
+import multiprocessing
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Add the parent directory to the path so we can import the database module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_manager import DatabaseManager
+from data_collection.collection_monitor import CollectionMonitor
+from data_collection.latency_sketch import LatencySketch
+
+# Non-speech annotations and speaker change markers: [Music], [Applause], (laughter), ♪, >>
+ARTIFACT_PATTERN = re.compile(
+    r"\[[^\]]*\]|\((?:music|applause|laughter|laughs|inaudible|crosstalk)\)|[♪♫]+|>>",
+    re.IGNORECASE
+)
+
+# Hesitation fillers, including hyphenated ones ("mm-hmm", "uh-huh") as whole tokens,
+# with the comma, period or dash that often follows them; "uh-oh" and "um-brella" are left alone
+FILLER_PATTERN = re.compile(
+    r"\b(?:u+h+|u+m+|e+r+m+|h+m+|m+h*m+)(?:-(?:h+u+h+|h+m+|m+h*m+))?\b(?!-\w)[-,.]?",
+    re.IGNORECASE
+)
+
+# Stuttered or repeated words ("I I I think"); "had had" and "that that" are usually intended
+REPEATED_WORD_PATTERN = re.compile(r"\b(?!(?:had|that)\b)(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+
+# Whitespace after sentence-ending punctuation, where a caption line is split
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.?!])\s+")
+
+# Lowercase standalone "i" as written by auto-captions
+LOWERCASE_I_PATTERN = re.compile(r"\bi\b")
+
+SENTENCE_END_CHARS = ('.', '?', '!')
+
+# Preprocessing workers send their stage time sketches to the parent after this many videos
+SKETCH_REPORT_INTERVAL = 100
+
+class TranscriptPreprocessor:
+    def __init__(self, db_manager: DatabaseManager, pause_seconds: float = 1.5,
+                 max_utterance_seconds: float = 15.0):
+        """
+        An utterance ends at sentence-ending punctuation, before a pause of at least
+        pause_seconds between caption lines, or once it is max_utterance_seconds long
+        (auto-captions often have no punctuation at all).
+        """
+        self.db = db_manager
+        self.pause_seconds = pause_seconds
+        self.max_utterance_seconds = max_utterance_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def clean_text(self, text: str) -> str:
+        """Strip caption artifacts and fillers, collapse repeated words and whitespace."""
+        text = ARTIFACT_PATTERN.sub(' ', text)
+        text = FILLER_PATTERN.sub(' ', text)
+        text = REPEATED_WORD_PATTERN.sub(r'\1', text)
+        return ' '.join(text.split())
+
+    def _split_lines(self, segments: Iterable) -> Iterator[Tuple[str, float, float, int]]:
+        """
+        Clean caption lines and split them at sentence ends.
+        Yields (text, start, end, line_number); a split line's time is shared out between its
+        pieces in proportion to their length. Auto-caption lines overlap, so each line's end
+        is clipped to the start of the next one.
+        """
+        previous = None
+        line_number = 0
+        for segment in segments:
+            if previous is not None:
+                text, start, end = previous
+                yield from self._split_line(text, start, min(end, max(start, segment.start_time)), line_number)
+                line_number += 1
+            text = self.clean_text(segment.text)
+            previous = (text, segment.start_time, segment.start_time + segment.duration) if text else None
+        if previous is not None:
+            yield from self._split_line(*previous, line_number)
+
+    def _split_line(self, text: str, start: float, end: float,
+                    line_number: int) -> Iterator[Tuple[str, float, float, int]]:
+        parts = SENTENCE_END_PATTERN.split(text)
+        if len(parts) == 1:
+            yield text, start, end, line_number
+            return
+        length = len(text)
+        span = end - start
+        offset = 0
+        for part in parts:
+            part_start = start + span * offset / length
+            offset = min(length, offset + len(part) + 1)
+            yield part, part_start, start + span * offset / length, line_number
+
+    def merge_utterances(self, segments: Iterable) -> Iterator[Dict]:
+        """
+        Merge one video's transcript segments, ordered by start time, into utterances.
+        Yields Utterance column dicts (without video_id).
+        """
+        texts = []
+        start = end = 0.0
+        segment_count = 0
+        last_line = -1
+        for text, piece_start, piece_end, line_number in self._split_lines(segments):
+            if texts and (piece_start - end >= self.pause_seconds
+                          or end - start >= self.max_utterance_seconds):
+                yield self._build_utterance(texts, start, end, segment_count)
+                texts = []
+            if not texts:
+                start = piece_start
+                segment_count = 0
+                last_line = -1
+            texts.append(text)
+            end = max(end, piece_end) if len(texts) > 1 else piece_end
+            if line_number != last_line:
+                segment_count += 1
+                last_line = line_number
+            if text.endswith(SENTENCE_END_CHARS):
+                yield self._build_utterance(texts, start, end, segment_count)
+                texts = []
+        if texts:
+            yield self._build_utterance(texts, start, end, segment_count)
+
+    def _build_utterance(self, texts, start: float, end: float, segment_count: int) -> Dict:
+        text = LOWERCASE_I_PATTERN.sub('I', ' '.join(texts))
+        # Auto-captions have no punctuation: make every utterance a sentence
+        if not text.endswith(SENTENCE_END_CHARS):
+            text += '.'
+        return {
+            'text': text[0].upper() + text[1:],
+            'start_time': start,
+            'end_time': end,
+            'segment_count': segment_count
+        }
+
+    def run(self, videos_per_batch: int = 100) -> Dict:
+        """
+        Preprocess every processed video that has not been preprocessed yet, in one streaming pass
+        that reads the transcripts of videos_per_batch videos at a time.
+        Returns counts of videos, transcript segments read and utterances written.
+        """
+        start = time.time()
+        videos_processed = 0
+        segments_read = 0
+        utterances_written = 0
+        rows = self.db.iter_unpreprocessed_transcript_segments(videos_per_batch=videos_per_batch)
+        for video_id, video_segments in groupby(rows, key=lambda row: row.video_id):
+            video_segments = list(video_segments)
+            written = self.db.replace_utterances(video_id, list(self.merge_utterances(video_segments)))
+            if written is None:
+                continue
+            videos_processed += 1
+            segments_read += len(video_segments)
+            utterances_written += written
+            if videos_processed % 100 == 0:
+                self.logger.info(f"Preprocessed {videos_processed} videos, {utterances_written} utterances so far")
+
+        elapsed = time.time() - start
+        rate = segments_read / elapsed * 60 if elapsed else 0.0
+        self.logger.info(
+            f"Preprocessing finished: {videos_processed} videos, {segments_read} segments, "
+            f"{utterances_written} utterances in {elapsed:.1f}s ({rate:,.0f} segments/min)"
+        )
+        return {
+            'videos_processed': videos_processed,
+            'segments_read': segments_read,
+            'utterances': utterances_written
+        }
+
+def _preprocess_worker(worker_id: int, progress_queue, pause_seconds: float, max_utterance_seconds: float):
+    """
+    Process-pool worker: claim videos one at a time and preprocess each within its claiming
+    transaction, until no video is left. Runs on its own engine and reports every video on
+    progress_queue. Per-stage times are kept in local sketches, sent as a ('stage_times', worker_id,
+    sketches) message every SKETCH_REPORT_INTERVAL videos and on exit.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = DatabaseManager()
+    preprocessor = TranscriptPreprocessor(db, pause_seconds, max_utterance_seconds)
+    failed_video_ids = set()
+    sketches = {}
+    
+    def time_stage(stage: str, stage_start: float):
+        sketches.setdefault(stage, LatencySketch()).add(time.time() - stage_start)
+    
+    def report_sketches():
+        if sketches:
+            progress_queue.put(('stage_times', worker_id, {stage: sketch.to_dict() for stage, sketch in sketches.items()}))
+            sketches.clear()
+    
+    videos_done = 0
+    try:
+        while True:
+            start = time.time()
+            video_id = None
+            try:
+                with db.claim_unpreprocessed_video(exclude=failed_video_ids) as video_id:
+                    if video_id is None:
+                        return
+                    time_stage('preprocess_claim', start)
+                    stage_start = time.time()
+                    segments = db.get_transcript_segments(video_id)
+                    time_stage('preprocess_read', stage_start)
+                    stage_start = time.time()
+                    utterances = list(preprocessor.merge_utterances(segments))
+                    time_stage('preprocess_merge', stage_start)
+                    stage_start = time.time()
+                    written = db.replace_utterances(video_id, utterances)
+                    time_stage('preprocess_write', stage_start)
+            except Exception as e:
+                logging.error(f"Error preprocessing video {video_id}: {e}")
+                if video_id is None:
+                    # Claiming itself failed; the database is unusable for this worker
+                    raise
+                written = None
+            if written is None:
+                # Leave the video for a later run instead of claiming it again right away
+                failed_video_ids.add(video_id)
+                progress_queue.put((worker_id, video_id, 0, 0, 0.0, False))
+                continue
+            progress_queue.put((worker_id, video_id, len(segments), written, time.time() - start, True))
+            videos_done += 1
+            if videos_done % SKETCH_REPORT_INTERVAL == 0:
+                report_sketches()
+    finally:
+        report_sketches()
+        db.engine.dispose()
+
+def preprocess_in_parallel(workers: Optional[int] = None, pause_seconds: float = 1.5,
+                           max_utterance_seconds: float = 15.0,
+                           monitor: Optional[CollectionMonitor] = None) -> Dict:
+    """
+    Preprocess every processed, not yet preprocessed video with a pool of worker processes.
+    
+    Work is sharded by video: each worker claims one video at a time from the database with
+    SELECT ... FOR UPDATE SKIP LOCKED (see DatabaseManager.claim_unpreprocessed_video), so no
+    coordination is needed between workers. If a worker dies, its transaction is aborted, the
+    video it held is claimed again by another worker and a replacement worker is started.
+    Progress is reported to monitor (a CollectionMonitor) as videos finish, and the workers'
+    stage time sketches are merged into it.
+    Claims only exclude each other on PostgreSQL: other databases (SQLite) ignore FOR UPDATE
+    SKIP LOCKED, so workers would preprocess the same video at the same time. There a single
+    worker is used, whatever workers is.
+    Returns counts of videos, transcript segments read and utterances written.
+    """
+    logger = logging.getLogger(__name__)
+    db = DatabaseManager()
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and db.engine.dialect.name != 'postgresql':
+        logger.warning(
+            f"{db.engine.dialect.name} cannot lock claimed videos; preprocessing with 1 worker instead of {workers}"
+        )
+        workers = 1
+    if monitor is None:
+        monitor = CollectionMonitor(db)
+    
+    # Spawned workers start clean instead of inheriting the parent's connections
+    context = multiprocessing.get_context('spawn')
+    progress_queue = context.Queue()
+    
+    def start_worker(worker_id: int):
+        process = context.Process(
+            target=_preprocess_worker,
+            args=(worker_id, progress_queue, pause_seconds, max_utterance_seconds),
+            daemon=True
+        )
+        process.start()
+        return process
+    
+    totals = {'videos_processed': 0, 'segments_read': 0, 'utterances': 0, 'errors': 0}
+    
+    def record(message):
+        if message[0] == 'stage_times':
+            monitor.merge_stage_times(message[2])
+            return
+        worker_id, video_id, segment_count, utterance_count, processing_time, success = message
+        monitor.record_preprocessing_progress(
+            worker_id, video_id, segment_count, utterance_count, processing_time, success=success
+        )
+        if not success:
+            totals['errors'] += 1
+            return
+        totals['videos_processed'] += 1
+        totals['segments_read'] += segment_count
+        totals['utterances'] += utterance_count
+        if totals['videos_processed'] % 100 == 0:
+            logger.info(f"Preprocessed {totals['videos_processed']} videos, {totals['utterances']} utterances so far")
+    
+    start = time.time()
+    processes = {worker_id: start_worker(worker_id) for worker_id in range(workers)}
+    next_worker_id = workers
+    restarts = 0
+    while processes:
+        try:
+            record(progress_queue.get(timeout=1.0))
+        except queue.Empty:
+            pass
+        for worker_id, process in list(processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del processes[worker_id]
+            if process.exitcode != 0 and restarts < workers:
+                logger.warning(
+                    f"Preprocessing worker {worker_id} exited with code {process.exitcode}; "
+                    f"its video will be claimed again, starting worker {next_worker_id}"
+                )
+                processes[next_worker_id] = start_worker(next_worker_id)
+                next_worker_id += 1
+                restarts += 1
+    
+    # Progress sent just before the last workers exited
+    while True:
+        try:
+            record(progress_queue.get_nowait())
+        except queue.Empty:
+            break
+    monitor.flush()
+    
+    elapsed = time.time() - start
+    rate = totals['segments_read'] / elapsed * 60 if elapsed else 0.0
+    logger.info(
+        f"Parallel preprocessing finished with {workers} workers: {totals['videos_processed']} videos, "
+        f"{totals['segments_read']} segments, {totals['utterances']} utterances in {elapsed:.1f}s "
+        f"({rate:,.0f} segments/min)"
+    )
+    return totals
+
+def main(workers: int = 1):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = DatabaseManager()
+    db.init_db()
+    if workers > 1:
+        preprocess_in_parallel(workers, monitor=CollectionMonitor(db))
+    else:
+        TranscriptPreprocessor(db).run()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
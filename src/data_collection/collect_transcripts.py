@@ -4,16 +4,18 @@ Script to collect and manage transcript data from JRE Clips.
 
 import os
 from youtube_transcript_fetcher import JRETranscriptFetcher
-from datetime import datetime
-import json
-import pandas as pd
+from transcript_archive import ARCHIVE_SCHEMA, DEFAULT_ARCHIVE_DIR
+import pyarrow as pa
+import pyarrow.acero as acero
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
 def main():
     # Initialize the transcript fetcher
     fetcher = JRETranscriptFetcher()
     
     # Create output directories if they don't exist
-    os.makedirs("../data/raw_transcripts", exist_ok=True)
+    os.makedirs(DEFAULT_ARCHIVE_DIR, exist_ok=True)
     os.makedirs("../data/processed_transcripts", exist_ok=True)
     
     # Fetch transcripts (limit to 100 videos initially as a test)
@@ -21,45 +23,84 @@ def main():
     fetcher.process_videos(max_videos=100)
     
     # Create a summary of collected data
-    create_data_summary()
+    create_data_summary(fetcher.archive.archive_dir if fetcher.archive else DEFAULT_ARCHIVE_DIR)
 
-def create_data_summary():
-    """Create a summary of collected transcripts."""
-    transcript_dir = "../data/raw_transcripts"
-    summary_data = []
+def _word_count(text: pc.Expression) -> pc.Expression:
+    """Number of whitespace-separated words, the same as len(text.split())."""
+    trimmed = pc.utf8_trim_whitespace(text)
+    words = pc.list_value_length(pc.utf8_split_whitespace(trimmed))
+    # Splitting an empty string still yields one (empty) word
+    return pc.subtract(words, pc.equal(trimmed, '').cast(pa.int32()))
+
+def _summarize_archive(archive_dir: str) -> pa.Table:
+    """
+    Sum each archived fetch's duration and word count in one streaming scan of the archive.
+    Returns one row per (video_id, fetch_date).
+    """
+    dataset = ds.dataset(archive_dir, schema=ARCHIVE_SCHEMA, format='parquet', partitioning='hive')
+    columns = ['video_id', 'fetch_date', 'title', 'published_at', 'duration', 'text']
+    plan = acero.Declaration.from_sequence([
+        acero.Declaration('scan', acero.ScanNodeOptions(dataset, columns=columns)),
+        acero.Declaration('project', acero.ProjectNodeOptions(
+            [pc.field('video_id'), pc.field('fetch_date'), pc.field('title'), pc.field('published_at'),
+             pc.field('duration'), _word_count(pc.field('text'))],
+            ['video_id', 'fetch_date', 'title', 'published_at', 'duration', 'words']
+        )),
+        acero.Declaration('aggregate', acero.AggregateNodeOptions(
+            [
+                # Title and publish date are the same on every segment of a fetch
+                ('title', 'hash_min', None, 'title'),
+                ('published_at', 'hash_min', None, 'published_at'),
+                ('duration', 'hash_sum', None, 'duration_seconds'),
+                ('words', 'hash_sum', None, 'word_count')
+            ],
+            keys=['video_id', 'fetch_date']
+        ))
+    ])
+    return plan.to_table()
+
+def create_data_summary(archive_dir: str = DEFAULT_ARCHIVE_DIR):
+    """
+    Create a summary of collected transcripts from the raw transcript archive.
     
-    for filename in os.listdir(transcript_dir):
-        if filename.endswith(".json"):
-            with open(os.path.join(transcript_dir, filename), 'r') as f:
-                data = json.load(f)
-                
-                # Calculate total duration and word count
-                transcript = data['transcript']
-                total_duration = sum(segment['duration'] for segment in transcript)
-                total_words = sum(len(segment['text'].split()) for segment in transcript)
-                
-                summary_data.append({
-                    'video_id': data['video_id'],
-                    'title': data['metadata']['title'],
-                    'published_at': data['metadata']['published_at'],
-                    'duration_seconds': total_duration,
-                    'word_count': total_words,
-                    'fetch_date': data['fetch_date']
-                })
+    The archive is aggregated per video by a vectorized, streaming Arrow query plan, so it
+    does not have to fit in memory. A video archived more than once is summarized from its
+    latest fetch. Writes transcript_summary.csv and a per-year rollup,
+    transcript_summary_by_year.csv, next to the archive.
+    """
+    output_dir = os.path.dirname(archive_dir)
+    if not os.path.isdir(archive_dir):
+        print("No transcripts found in the data directory.")
+        return
     
-    if summary_data:
-        df = pd.DataFrame(summary_data)
-        df['published_at'] = pd.to_datetime(df['published_at'])
-        df['fetch_date'] = pd.to_datetime(df['fetch_date'])
+    summary = _summarize_archive(archive_dir)
+    
+    if summary.num_rows:
+        df = summary.to_pandas()
+        df = df.sort_values('fetch_date').drop_duplicates('video_id', keep='last')
+        df = df[['video_id', 'title', 'published_at', 'duration_seconds', 'word_count', 'fetch_date']]
+        df = df.sort_values('published_at').reset_index(drop=True)
         
         # Save summary to CSV
-        df.to_csv("../data/transcript_summary.csv", index=False)
+        df.to_csv(os.path.join(output_dir, "transcript_summary.csv"), index=False)
+        
+        # Per-year rollup
+        by_year = df.groupby(df['published_at'].dt.year.rename('year')).agg(
+            videos=('video_id', 'size'),
+            duration_seconds=('duration_seconds', 'sum'),
+            word_count=('word_count', 'sum'),
+            mean_duration_seconds=('duration_seconds', 'mean'),
+            mean_word_count=('word_count', 'mean')
+        )
+        by_year.to_csv(os.path.join(output_dir, "transcript_summary_by_year.csv"))
         
         print("\nData Collection Summary:")
         print(f"Total videos processed: {len(df)}")
         print(f"Date range: {df['published_at'].min()} to {df['published_at'].max()}")
         print(f"Average duration: {df['duration_seconds'].mean():.2f} seconds")
         print(f"Average word count: {df['word_count'].mean():.0f} words")
+        print("\nVideos per year:")
+        print(by_year[['videos', 'duration_seconds', 'word_count']].to_string())
     else:
         print("No transcripts found in the data directory.")
 
@@ -8,36 +8,151 @@ from datetime import datetime, timedelta
 import json
 from collections import defaultdict
 import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, run a single writer at a time there
+    fcntl = None
+
+from data_collection.latency_sketch import LatencySketch
+
+# Stage under which the total processing time of each video is tracked
+TOTAL_STAGE = 'total'
+
+# Statistics kept as counters keyed by name
+COUNTER_KEYS = ('videos_by_year', 'videos_by_guest', 'political_categories', 'error_counts')
+
+def _daily_counters() -> Dict:
+    return {
+        'videos_processed': 0,
+        'segments_collected': 0,
+        'errors': 0
+    }
 
 class CollectionMonitor:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, batch_size: int = 100, flush_interval: float = 5.0,
+                 compact_every: int = 10000, metrics=None, logs_dir: Optional[str] = None):
+        """
+        Statistics are persisted as an append-only journal of events next to a snapshot.
+        Events are written in batches of batch_size, or once flush_interval seconds have
+        passed since the last write; after compact_every journaled events the statistics are
+        compacted into a new snapshot and the journal starts over. Call flush() when done.
+        Several processes (the fetcher and preprocessing) may share the files: appends and
+        compaction hold a file lock, and compaction folds in every process's events.
+        Updates are also counted in metrics (a MetricsExporter), if given.
+        """
         self.db = db_manager
+        self.metrics = metrics
         self.logger = logging.getLogger(__name__)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
         
         # Set up logs directory
-        self.logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+        self.logs_dir = logs_dir or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
         os.makedirs(self.logs_dir, exist_ok=True)
         
         self.stats_file = os.path.join(self.logs_dir, "collection_stats.json")
-        self._load_stats()
+        self.journal_file = os.path.join(self.logs_dir, "collection_stats.journal.jsonl")
+        self.lock_file = os.path.join(self.logs_dir, "collection_stats.lock")
+        # Guards stats updates from pipelined worker threads
+        self.lock = threading.Lock()
+        self.pending_events = []
+        self.last_flush = time.monotonic()
+        with self._file_lock():
+            self._load_stats()
+        atexit.register(self.flush)
+        
+    @contextmanager
+    def _file_lock(self):
+        """Hold the lock shared with other processes writing the same snapshot and journal."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
         
     def _load_stats(self):
-        """Load statistics from file or initialize new stats."""
+        """
+        Load the statistics snapshot, then replay the journaled events recorded after it.
+        Each journal starts with a header holding its generation; the snapshot records the last
+        generation folded into it, so a journal left behind by a crash during compaction is skipped
+        and replaced, finishing the compaction. Called with the file lock held.
+        """
+        self.stats = self._init_stats()
         if os.path.exists(self.stats_file):
             try:
                 with open(self.stats_file, 'r') as f:
-                    self.stats = json.load(f)
+                    self.stats.update(json.load(f))
             except Exception as e:
                 self.logger.error(f"Error loading stats file: {e}")
                 self.stats = self._init_stats()
-        else:
-            self.stats = self._init_stats()
+        # Snapshots from before journal generations numbered events instead
+        self.stats.pop('last_seq', None)
+        self._restore_counters()
+        self._restore_stage_times()
+        
+        self.journaled_events = 0
+        self.journal_generation = self.stats['journal_generation'] + 1
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # A write cut short by a crash
+                        continue
+                    if 'generation' in event:
+                        if event['generation'] <= self.stats['journal_generation']:
+                            # The snapshot already includes this journal (crash during compaction)
+                            break
+                        self.journal_generation = event['generation']
+                        continue
+                    self._apply_event(event)
+                    self.journaled_events += 1
+                else:
+                    return
+            self._start_journal()
+            
+    def _start_journal(self):
+        """Replace the journal with an empty one of the next generation. Called with the file lock held."""
+        tmp_file = self.journal_file + '.tmp'
+        try:
+            with open(tmp_file, 'w') as f:
+                f.write(json.dumps({'generation': self.journal_generation}) + '\n')
+            os.replace(tmp_file, self.journal_file)
+            self.journaled_events = 0
+        except Exception as e:
+            self.logger.error(f"Error starting new stats journal: {e}")
+            
+    def _restore_counters(self):
+        """JSON loads counters as plain dicts; restore the defaultdicts the update code relies on."""
+        for key in COUNTER_KEYS:
+            self.stats[key] = defaultdict(int, self.stats[key])
+        self.stats['daily_stats'] = defaultdict(_daily_counters, self.stats['daily_stats'])
+            
+    def _restore_stage_times(self):
+        """Rebuild the stage time sketches; older snapshots kept every processing time in a list."""
+        self.stats['stage_times'] = {
+            stage: LatencySketch.from_dict(sketch) for stage, sketch in self.stats['stage_times'].items()
+        }
+        for processing_time in self.stats.pop('processing_times', None) or []:
+            self._add_stage_time(TOTAL_STAGE, processing_time)
             
     def _init_stats(self) -> Dict:
         """Initialize statistics structure."""
         return {
             'start_time': datetime.utcnow().isoformat(),
             'last_update': datetime.utcnow().isoformat(),
+            'journal_generation': 0,
             'total_videos': 0,
             'processed_videos': 0,
             'failed_videos': 0,
@@ -46,71 +161,226 @@ class CollectionMonitor:
             'videos_by_year': defaultdict(int),
             'videos_by_guest': defaultdict(int),
             'political_categories': defaultdict(int),
-            'processing_times': [],
+            'stage_times': {},
             'error_counts': defaultdict(int),
-            'daily_stats': defaultdict(lambda: {
-                'videos_processed': 0,
-                'segments_collected': 0,
-                'errors': 0
-            })
+            'daily_stats': defaultdict(_daily_counters),
+            'preprocessing': self._init_preprocessing_stats()
+        }
+        
+    def _init_preprocessing_stats(self) -> Dict:
+        return {
+            'videos': 0,
+            'segments': 0,
+            'utterances': 0,
+            'errors': 0,
+            'processing_time': 0.0,
+            'videos_by_worker': {}
         }
         
     def _save_stats(self):
-        """Save current statistics to file."""
+        """Write a snapshot of the current statistics, atomically."""
+        tmp_file = self.stats_file + '.tmp'
         try:
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
+            snapshot = dict(self.stats)
+            snapshot['stage_times'] = {stage: sketch.to_dict() for stage, sketch in self.stats['stage_times'].items()}
+            with open(tmp_file, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_file, self.stats_file)
+            return True
         except Exception as e:
             self.logger.error(f"Error saving stats file: {e}")
+            return False
             
-    def update_video_processed(self, video_id: str, success: bool, 
-                             segment_count: int = 0, processing_time: float = 0):
-        """Update statistics after processing a video."""
-        video = self.db.get_video(video_id)
-        if not video:
+    def _record(self, event: Dict):
+        """Apply an event to the statistics and queue it for the journal. Called with the lock held."""
+        event['time'] = datetime.utcnow().isoformat()
+        self._apply_event(event)
+        self.pending_events.append(event)
+        if (len(self.pending_events) >= self.batch_size
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self._flush_pending()
+            
+    def _flush_pending(self):
+        """Append pending events to the journal, compacting it once it is long enough."""
+        if self.pending_events:
+            try:
+                with self._file_lock(), open(self.journal_file, 'a') as f:
+                    if f.tell() == 0:
+                        f.write(json.dumps({'generation': self.journal_generation}) + '\n')
+                    f.write(''.join(json.dumps(event) + '\n' for event in self.pending_events))
+                self.journaled_events += len(self.pending_events)
+                self.pending_events = []
+            except Exception as e:
+                self.logger.error(f"Error writing stats journal: {e}")
+        self.last_flush = time.monotonic()
+        if self.journaled_events >= self.compact_every:
+            self._compact()
+            
+    def _compact(self):
+        """
+        Fold the journal into a new snapshot and start a new journal. The statistics are
+        reloaded from disk first, so events other processes journaled are kept.
+        """
+        if self.pending_events:
             return
+        with self._file_lock():
+            self._load_stats()
+            self.stats['journal_generation'] = self.journal_generation
+            if not self._save_stats():
+                return
+            self.journal_generation += 1
+            self._start_journal()
+            
+    def flush(self):
+        """Write all pending events to the journal."""
+        with self.lock:
+            self._flush_pending()
+            
+    def _apply_event(self, event: Dict):
+        """Apply a journaled event to the in-memory statistics."""
+        self.stats['last_update'] = event['time']
+        today = event['time'][:10]
+        kind = event['type']
+        if kind == 'video_processed':
+            self._apply_video_processed(event, today)
+        elif kind == 'error':
+            self.stats['error_counts'][event['error_type']] += 1
+            if event['video_failed']:
+                self.stats['failed_videos'] += 1
+            self.stats['daily_stats'][today]['errors'] += 1
+        elif kind == 'preprocessing':
+            self._apply_preprocessing(event)
+        elif kind == 'stage_time':
+            self._add_stage_time(event['stage'], event['seconds'])
+        elif kind == 'stage_sketches':
+            for stage, sketch in event['sketches'].items():
+                self._stage_sketch(stage).merge(LatencySketch.from_dict(sketch))
+            
+    def update_video_processed(self, video_id: str, success: bool, 
+                             segment_count: int = 0, processing_time: float = 0,
+                             video=None, guest_name: Optional[str] = None):
+        """
+        Update statistics after processing a video.
+        Callers that just stored the video pass it, with its guest's name, so it is not read back.
+        """
+        if video is None:
+            video = self.db.get_video(video_id)
+            if not video:
+                return
+            guest_name = video.guest.name if video.guest else None
+        
+        event = {
+            'type': 'video_processed',
+            'success': success,
+            'segment_count': segment_count,
+            'processing_time': processing_time,
+            'year': video.published_at.year,
+            'guest': guest_name,
+            'political_categories': video.political_categories or []
+        }
+        with self.lock:
+            self._record(event)
+        if self.metrics:
+            if success:
+                self.metrics.inc('jre_videos_ingested_total')
+                self.metrics.inc('jre_segments_ingested_total', segment_count)
+            else:
+                self.metrics.inc('jre_videos_failed_total')
+            if processing_time > 0:
+                self.metrics.observe('jre_stage_seconds', processing_time, stage=TOTAL_STAGE)
             
+    def _apply_video_processed(self, event: Dict, today: str):
+        """Apply a processed video to the in-memory statistics."""
+        segment_count = event['segment_count']
+        
         # Update basic counts
         self.stats['total_videos'] += 1
-        if success:
+        if event['success']:
             self.stats['processed_videos'] += 1
             self.stats['total_segments'] += segment_count
         else:
             self.stats['failed_videos'] += 1
             
         # Update by year
-        year = video.published_at.year
-        self.stats['videos_by_year'][str(year)] += 1
+        self.stats['videos_by_year'][str(event['year'])] += 1
         
         # Update by guest
-        if video.guest:
-            self.stats['videos_by_guest'][video.guest.name] += 1
+        if event['guest']:
+            self.stats['videos_by_guest'][event['guest']] += 1
             
         # Update political categories
-        if video.political_categories:
-            for category in video.political_categories:
-                self.stats['political_categories'][category] += 1
+        for category in event['political_categories']:
+            self.stats['political_categories'][category] += 1
                 
         # Update processing times
-        if processing_time > 0:
-            self.stats['processing_times'].append(processing_time)
+        if event['processing_time'] > 0:
+            self._add_stage_time(TOTAL_STAGE, event['processing_time'])
             
         # Update daily stats
-        today = datetime.utcnow().date().isoformat()
         self.stats['daily_stats'][today]['videos_processed'] += 1
         self.stats['daily_stats'][today]['segments_collected'] += segment_count
         
-        self.stats['last_update'] = datetime.utcnow().isoformat()
-        self._save_stats()
+    def record_stage_time(self, stage: str, seconds: float):
+        """Record how long one processing stage of a video took."""
+        with self.lock:
+            self._record({'type': 'stage_time', 'stage': stage, 'seconds': seconds})
+        if self.metrics:
+            self.metrics.observe('jre_stage_seconds', seconds, stage=stage)
+            
+    def merge_stage_times(self, sketches: Dict[str, Dict]):
+        """Merge stage time sketches kept by another process (LatencySketch.to_dict() per stage)."""
+        with self.lock:
+            self._record({'type': 'stage_sketches', 'sketches': sketches})
+            
+    def _stage_sketch(self, stage: str) -> LatencySketch:
+        sketch = self.stats['stage_times'].get(stage)
+        if sketch is None:
+            sketch = self.stats['stage_times'][stage] = LatencySketch()
+        return sketch
         
+    def _add_stage_time(self, stage: str, seconds: float):
+        self._stage_sketch(stage).add(seconds)
+            
     def record_error(self, error_type: str, video_id: Optional[str] = None):
         """Record an error in the statistics."""
-        self.stats['error_counts'][error_type] += 1
-        if video_id:
-            self.stats['failed_videos'] += 1
-        today = datetime.utcnow().date().isoformat()
-        self.stats['daily_stats'][today]['errors'] += 1
-        self._save_stats()
+        with self.lock:
+            self._record({'type': 'error', 'error_type': error_type, 'video_failed': bool(video_id)})
+        if self.metrics:
+            self.metrics.inc('jre_errors_total', type=error_type)
+            
+    def record_preprocessing_progress(self, worker_id: int, video_id: Optional[str], segment_count: int = 0,
+                                      utterance_count: int = 0, processing_time: float = 0,
+                                      success: bool = True):
+        """Update statistics after a preprocessing worker has finished (or failed) a video."""
+        if not success:
+            self.logger.warning(f"Preprocessing failed for video {video_id} (worker {worker_id})")
+        with self.lock:
+            self._record({
+                'type': 'preprocessing',
+                'worker_id': worker_id,
+                'success': success,
+                'segment_count': segment_count,
+                'utterance_count': utterance_count,
+                'processing_time': processing_time
+            })
+        if self.metrics:
+            if success:
+                self.metrics.inc('jre_videos_preprocessed_total')
+            else:
+                self.metrics.inc('jre_errors_total', type='preprocessing_error')
+            
+    def _apply_preprocessing(self, event: Dict):
+        stats = self.stats['preprocessing']
+        if event['success']:
+            stats['videos'] += 1
+            stats['segments'] += event['segment_count']
+            stats['utterances'] += event['utterance_count']
+            stats['processing_time'] += event['processing_time']
+            worker = str(event['worker_id'])
+            stats['videos_by_worker'][worker] = stats['videos_by_worker'].get(worker, 0) + 1
+        else:
+            stats['errors'] += 1
+            self.stats['error_counts']['preprocessing_error'] += 1
         
     def get_collection_summary(self) -> Dict:
         """Generate a summary of collection progress."""
@@ -135,11 +405,11 @@ class CollectionMonitor:
                 reverse=True
             )[:5],
             'error_summary': dict(self.stats['error_counts']),
-            'processing_time_stats': {
-                'average': sum(self.stats['processing_times'])/len(self.stats['processing_times']) 
-                    if self.stats['processing_times'] else 0,
-                'min': min(self.stats['processing_times']) if self.stats['processing_times'] else 0,
-                'max': max(self.stats['processing_times']) if self.stats['processing_times'] else 0
+            'preprocessing': self.stats['preprocessing'],
+            'processing_time_stats': self._stage_sketch(TOTAL_STAGE).summary(),
+            'stage_time_stats': {
+                stage: sketch.summary() for stage, sketch in self.stats['stage_times'].items()
+                if stage != TOTAL_STAGE
             }
         }
         return summary
@@ -167,42 +437,20 @@ class CollectionMonitor:
             'daily_data': daily_data
         }
         
-    def get_guest_statistics(self) -> Dict:
-        """Generate statistics about guests and their appearances."""
-        guest_stats = {}
-        for guest_name, count in self.stats['videos_by_guest'].items():
-            guest = self.db.get_guest_by_name(guest_name)
-            if not guest:
-                continue
-                
-            videos = self.db.get_videos_by_guest(guest_name)
-            if not videos:
-                guest_stats[guest_name] = {
-                    'appearance_count': count,
-                    'first_appearance': None,
-                    'last_appearance': None,
-                    'average_political_score': 0
-                }
-                continue
-                
-            # Get all valid political scores
-            political_scores = [v.political_score for v in videos if v.political_score is not None]
-            avg_political_score = sum(political_scores) / len(political_scores) if political_scores else 0
-            
-            # Get all valid dates
-            valid_dates = [v.published_at for v in videos if v.published_at is not None]
-            if valid_dates:
-                first_appearance = min(valid_dates)
-                last_appearance = max(valid_dates)
-            else:
-                first_appearance = None
-                last_appearance = None
-                
-            guest_stats[guest_name] = {
-                'appearance_count': count,
+    def get_guest_statistics(self, from_view: bool = False) -> Dict:
+        """
+        Generate statistics about guests and their appearances, from one aggregate query.
+        from_view reads the guest_stats materialized view (see DatabaseManager.refresh_guest_stats).
+        """
+        rows = self.db.get_guest_statistics(from_view=from_view)
+        if rows is None:
+            return {}
+        return {
+            name: {
+                'appearance_count': appearance_count,
                 'first_appearance': first_appearance.isoformat() if first_appearance else None,
                 'last_appearance': last_appearance.isoformat() if last_appearance else None,
-                'average_political_score': avg_political_score
+                'average_political_score': average_political_score or 0
             }
-            
-        return guest_stats 
\ No newline at end of file
+            for name, appearance_count, first_appearance, last_appearance, average_political_score in rows
+        }
\ No newline at end of file
@@ -4,7 +4,7 @@ Module for data quality checks and validation of collected transcripts.
 
 import logging
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, UTC
 import re
 from collections import Counter
 from database.models import Video  # Add this import
@@ -19,14 +19,31 @@ class DataQualityChecker:
         Check if a transcript is complete and valid.
         Returns (is_complete, issues) where issues is a dict of problems found.
         """
-        issues = {}
-        
         # Get video and transcript segments
         video = self.db.get_video(video_id)
         if not video:
             return False, {"error": "Video not found"}
             
         segments = self.db.get_transcript_segments(video_id)
+        return self._check_segments(
+            [(segment.start_time, segment.duration, segment.text) for segment in segments],
+            [segment.id for segment in segments]
+        )
+        
+    def check_transcript(self, transcript: List[Dict]) -> Tuple[bool, Dict]:
+        """
+        In-memory variant of check_transcript_completeness for a transcript API result,
+        run before it is stored. Short segments are reported by their index in the transcript.
+        """
+        order = sorted(range(len(transcript)), key=lambda i: transcript[i]['start'])
+        segments = [
+            (transcript[i]['start'], transcript[i]['duration'], transcript[i]['text']) for i in order
+        ]
+        return self._check_segments(segments, order)
+        
+    def _check_segments(self, segments: List[Tuple[float, float, str]], segment_ids: List) -> Tuple[bool, Dict]:
+        """Run the transcript checks over (start, duration, text) tuples ordered by start time."""
+        issues = {}
         if not segments:
             return False, {"error": "No transcript segments found"}
             
@@ -37,8 +54,8 @@ class DataQualityChecker:
         # Check for time gaps
         time_gaps = []
         for i in range(len(segments) - 1):
-            current_end = segments[i].start_time + segments[i].duration
-            next_start = segments[i + 1].start_time
+            current_end = segments[i][0] + segments[i][1]
+            next_start = segments[i + 1][0]
             if next_start - current_end > 5.0:  # 5 second gap threshold
                 time_gaps.append((current_end, next_start))
         if time_gaps:
@@ -46,14 +63,14 @@ class DataQualityChecker:
             
         # Check for empty or very short segments
         short_segments = []
-        for segment in segments:
-            if len(segment.text.strip()) < 5:  # 5 character minimum
-                short_segments.append(segment.id)
+        for (_, _, text), segment_id in zip(segments, segment_ids):
+            if len(text.strip()) < 5:  # 5 character minimum
+                short_segments.append(segment_id)
         if short_segments:
             issues["short_segments"] = short_segments
             
         # Check for duplicate segments
-        text_counts = Counter(segment.text.strip() for segment in segments)
+        text_counts = Counter(text.strip() for _, _, text in segments)
         duplicates = [text for text, count in text_counts.items() if count > 1]
         if duplicates:
             issues["duplicates"] = duplicates
@@ -65,11 +82,18 @@ class DataQualityChecker:
         Validate video metadata for completeness and correctness.
         Returns (is_valid, issues) where issues is a dict of problems found.
         """
-        issues = {}
         video = self.db.get_video(video_id)
         if not video:
             return False, {"error": "Video not found"}
-            
+        return self.check_video_metadata(video)
+        
+    def check_video_metadata(self, video: Video) -> Tuple[bool, Dict]:
+        """
+        In-memory variant of validate_video_metadata for an already loaded Video.
+        Returns (is_valid, issues) where issues is a dict of problems found.
+        """
+        issues = {}
+        
         # Check required fields
         required_fields = ['title', 'published_at', 'video_id', 'channel_title']
         for field in required_fields:
@@ -78,9 +102,13 @@ class DataQualityChecker:
                 
         # Validate dates
         if video.published_at:
-            if video.published_at > datetime.utcnow():
+            published_at = video.published_at
+            # Compare as naive UTC, the way the column is stored
+            if published_at.tzinfo is not None:
+                published_at = published_at.astimezone(UTC).replace(tzinfo=None)
+            if published_at > datetime.utcnow():
                 issues["future_date"] = "Publication date is in the future"
-            if video.published_at < datetime(2017, 1, 1):
+            if published_at < datetime(2017, 1, 1):
                 issues["date_range"] = "Publication date is before 2017"
                 
         # Validate episode number format
@@ -0,0 +1,113 @@
+"""
+Political keyword taxonomy and a precompiled matcher for scoring text against it.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Political keywords organized by category
+POLITICAL_KEYWORDS = {
+    'core_politics': [
+        "politics", "political", "election", "democracy", "government",
+        "policy", "legislation", "congress", "senate", "house"
+    ],
+    'parties_ideologies': [
+        "democrat", "republican", "liberal", "conservative",
+        "libertarian", "progressive", "left wing", "right wing",
+        "socialist", "capitalist"
+    ],
+    'political_figures': [
+        "trump", "biden", "obama", "clinton", "sanders", "warren",
+        "pence", "harris", "pelosi", "mcconnell"
+    ],
+    'policy_issues': [
+        "immigration", "healthcare", "climate change", "foreign policy",
+        "censorship", "free speech", "gun control", "abortion",
+        "taxation", "welfare"
+    ],
+    'cultural_issues': [
+        "woke", "cancel culture", "identity politics", "social justice",
+        "critical race theory", "gender", "equality", "diversity"
+    ]
+}
+
+def _normalize(keyword: str) -> str:
+    return ' '.join(keyword.lower().split())
+
+def _trie_regex(keywords: List[str]) -> str:
+    """
+    Build a regex alternation from a character trie of the keywords, so shared prefixes
+    are matched once instead of retrying every keyword at each word boundary.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a keyword
+
+    def build(node: Dict) -> str:
+        if list(node) == ['']:
+            return ''
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        # A keyword ends here but longer ones continue: the greedy '?' prefers the longer match
+        return group + '?' if '' in node else group
+
+    return build(trie)
+
+class KeywordMatcher:
+    """
+    Matches a keyword taxonomy against text in one pass with a single precompiled regex.
+
+    Keywords match whole words only ("house" does not match "warehouse"), case-insensitively,
+    with an optional plural "s" and any whitespace between the words of multi-word keywords.
+    A keyword that contains another one ("identity politics" / "politics") counts for both.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.taxonomy = taxonomy
+
+        # Normalized keyword -> categories it belongs to
+        self.keyword_categories = {}
+        for category, keywords in taxonomy.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(_normalize(keyword), []).append(category)
+
+        # Keywords that occur as whole words inside a longer keyword
+        self.nested_keywords = {
+            keyword: [
+                other for other in self.keyword_categories
+                if other != keyword and re.search(rf"\b{re.escape(other)}\b", keyword)
+            ]
+            for keyword in self.keyword_categories
+        }
+
+        self.pattern = re.compile(rf"\b({_trie_regex(list(self.keyword_categories))})s?\b", re.IGNORECASE)
+
+    def match_keywords(self, text: str) -> Counter:
+        """Count occurrences of each keyword in text."""
+        counts = Counter()
+        for match in self.pattern.finditer(text):
+            keyword = _normalize(match.group(1))
+            counts[keyword] += 1
+            for nested in self.nested_keywords[keyword]:
+                counts[nested] += 1
+        return counts
+
+    def match(self, text: str) -> Dict[str, Counter]:
+        """
+        Match text against the taxonomy.
+        Returns a dict mapping each matched category to a Counter of keyword occurrences.
+        """
+        matches = {}
+        for keyword, count in self.match_keywords(text).items():
+            for category in self.keyword_categories[keyword]:
+                matches.setdefault(category, Counter())[keyword] = count
+        return matches
@@ -0,0 +1,121 @@
+"""
+Mergeable streaming percentile sketch for processing times.
+
+A LatencySketch is a DDSketch: values are counted in logarithmically sized buckets, so every
+quantile is answered within a fixed relative error (1% by default) using a bounded number of
+buckets, whatever the number of values. Sketches with the same accuracy merge exactly (bucket
+counts add up), so sketches kept by parallel workers can be combined into one.
+"""
+
+import math
+from typing import Dict, Optional
+
+class LatencySketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048,
+                 min_value: float = 1e-6):
+        """
+        Values at or below min_value seconds are counted as zero. If more than max_buckets
+        buckets are needed, the lowest buckets are collapsed into one: only the smallest
+        values lose accuracy, the tail stays exact to relative_accuracy.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        """Add a value (in seconds)."""
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Merge the lowest buckets until at most max_buckets remain."""
+        indexes = sorted(self.buckets)
+        excess = len(indexes) - self.max_buckets
+        collapsed = sum(self.buckets.pop(index) for index in indexes[:excess])
+        self.buckets[indexes[excess]] += collapsed
+
+    def merge(self, other: 'LatencySketch'):
+        """Add another sketch's values to this one. Both must have the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the value at quantile q (0 to 1), or None if the sketch is empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return self.min
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i], within relative_accuracy of any value in it
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        """Count, average, min, max and the p50/p95/p99 quantiles."""
+        return {
+            'count': self.count,
+            'average': self.sum / self.count if self.count else 0,
+            'min': self.min or 0,
+            'max': self.max or 0,
+            'p50': self.quantile(0.50) or 0,
+            'p95': self.quantile(0.95) or 0,
+            'p99': self.quantile(0.99) or 0
+        }
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form, for the stats snapshot and for sending between processes."""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_buckets': self.max_buckets,
+            'min_value': self.min_value,
+            'buckets': {str(index): count for index, count in self.buckets.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencySketch':
+        sketch = cls(data['relative_accuracy'], data['max_buckets'], data['min_value'])
+        sketch.buckets = {int(index): count for index, count in data['buckets'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        return sketch
@@ -0,0 +1,187 @@
+"""
+Embedded Prometheus metrics endpoint for long-running collection jobs.
+
+MetricsExporter serves the Prometheus text format on http://<host>:<port>/metrics from a
+daemon thread. Workers update counters and histograms without taking a lock: every thread
+writes to its own cell and a scrape adds the cells up. When a thread exits, its cell is folded
+into a shared total and dropped, so short-lived worker threads do not accumulate cells. Values
+read from other components (such as the rate limiter's call counts) are pulled at scrape time
+by collectors.
+"""
+
+import bisect
+import logging
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Name -> (type, help) of every metric updated by the pipeline
+METRICS = {
+    'jre_videos_ingested_total': ('counter', 'Videos stored with their transcript.'),
+    'jre_videos_failed_total': ('counter', 'Videos that could not be stored.'),
+    'jre_segments_ingested_total': ('counter', 'Transcript segments stored.'),
+    'jre_videos_preprocessed_total': ('counter', 'Videos turned into utterances by the preprocessor.'),
+    'jre_errors_total': ('counter', 'Errors by type, as in the collection stats error_counts.'),
+    'jre_stage_seconds': ('histogram', 'Duration of processing stages.')
+}
+
+# Prometheus' default latency buckets, extended for slow transcript fetches and retries
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+class _Cell:
+    """One thread's counter values and histogram bucket counts."""
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+
+    def add(self, other: '_Cell'):
+        """Add another cell's values to this one."""
+        # Copies are taken under the GIL; the owning thread may keep updating the originals
+        for key, value in other.counters.copy().items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, buckets in other.histograms.copy().items():
+            total = self.histograms.setdefault(key, [0] * len(buckets))
+            for index, count in enumerate(list(buckets)):
+                total[index] += count
+
+class _CellOwner:
+    """Kept in a thread's local storage: collected when the thread exits, which retires its cell."""
+    __slots__ = ('__weakref__',)
+
+class MetricsExporter:
+    def __init__(self, port: int = 9100, host: str = '127.0.0.1'):
+        """port 0 binds a free port (see self.port once started)."""
+        self.host = host
+        self.port = port
+        self.local = threading.local()
+        self.cells = []
+        self.retired = _Cell()  # Values of the threads that have exited
+        self.cells_lock = threading.Lock()  # Taken once per thread, when its cell is created and retired
+        self.collectors = []
+        self.server = None
+
+    def _cell(self) -> _Cell:
+        cell = getattr(self.local, 'cell', None)
+        if cell is None:
+            cell = self.local.cell = _Cell()
+            owner = self.local.owner = _CellOwner()
+            with self.cells_lock:
+                self.cells.append(cell)
+            weakref.finalize(owner, self._retire, cell)
+        return cell
+
+    def _retire(self, cell: _Cell):
+        """Fold the cell of a thread that has exited into the shared total."""
+        with self.cells_lock:
+            self.retired.add(cell)
+            self.cells.remove(cell)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add value to a counter."""
+        counters = self._cell().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Add a value to a histogram."""
+        histograms = self._cell().histograms
+        key = (name, tuple(sorted(labels.items())))
+        buckets = histograms.get(key)
+        if buckets is None:
+            buckets = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        buckets[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        buckets[-1] += value
+
+    def add_collector(self, name: str, metric_type: str, help_text: str,
+                      collect: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        """Export metric name with the (labels, value) pairs returned by collect() at every scrape."""
+        self.collectors.append((name, metric_type, help_text, collect))
+
+    def render(self) -> str:
+        """Current values of every metric in the Prometheus text exposition format."""
+        totals = _Cell()
+        with self.cells_lock:
+            totals.add(self.retired)
+            cells = list(self.cells)
+        for cell in cells:
+            totals.add(cell)
+        counters = totals.counters
+        histograms = totals.histograms
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == 'counter':
+                samples = [(labels, value) for (metric, labels), value in counters.items() if metric == name]
+                lines.extend(f'{name}{_format_labels(labels)} {value}' for labels, value in sorted(samples))
+                if not samples and name != 'jre_errors_total':
+                    lines.append(f'{name} 0')
+            else:
+                for (metric, labels), buckets in sorted(histograms.items()):
+                    if metric == name:
+                        lines.extend(self._render_histogram(name, labels, buckets))
+        for name, metric_type, help_text, collect in self.collectors:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            try:
+                for labels, value in collect():
+                    lines.append(f'{name}{_format_labels(tuple(sorted(labels.items())))} {value}')
+            except Exception as e:
+                logging.error(f"Error collecting metric {name}: {e}")
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name: str, labels: Labels, buckets: List[float]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {buckets[-1]}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+    def start(self) -> 'MetricsExporter':
+        """Serve /metrics from a daemon thread."""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True).start()
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
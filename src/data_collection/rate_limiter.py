@@ -0,0 +1,163 @@
+"""
+Rate limiting primitives shared by the YouTube collection workers.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace API requests across worker threads."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        rate is the number of tokens added per second, capacity the maximum burst size.
+        The bucket starts full so the first requests are not delayed.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until the requested tokens are available and take them.
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait_time = (tokens - self.tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+
+# Transcript API exceptions that mean YouTube is throttling us
+THROTTLE_EXCEPTION_NAMES = {'TooManyRequests', 'RequestBlocked', 'IpBlocked'}
+
+# Data API 403 reasons that are per-second throttles rather than an exhausted daily quota
+THROTTLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Check whether an exception from the Data API or transcript API is a rate-limit response."""
+    if type(error).__name__ in THROTTLE_EXCEPTION_NAMES:
+        return True
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status == 429:
+        return True
+    if status == 403 and any(reason in str(error) for reason in THROTTLE_REASONS):
+        return True
+    return "too many requests" in str(error).lower()
+
+
+class AdaptiveRateLimiter:
+    """
+    Single rate-limiting gate for every YouTube API call made by the fetcher.
+    
+    Each endpoint has its own token-bucket budget (requests per second) and an
+    AIMD concurrency limit: every successful call raises the limit additively,
+    every throttle response halves it. Throttled calls are retried with
+    decorrelated jitter backoff.
+    """
+
+    def __init__(self, budgets: Dict[str, float], max_concurrency: int = 8,
+                 base_delay: float = 1.0, max_delay: float = 60.0, max_attempts: int = 5):
+        self.max_concurrency = max_concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.condition = threading.Condition()
+        self.endpoints = {}
+        for endpoint, rate in budgets.items():
+            self.add_endpoint(endpoint, rate)
+
+    def add_endpoint(self, endpoint: str, rate: float):
+        """Register an endpoint with a budget of rate requests per second."""
+        with self.condition:
+            self.endpoints[endpoint] = {
+                'bucket': TokenBucket(rate=rate, capacity=max(1.0, rate)),
+                'concurrency_limit': 1.0,
+                'in_flight': 0,
+                'permits_granted': 0,
+                'throttles': 0,
+                'wait_time': 0.0
+            }
+
+    def _acquire(self, endpoint: str):
+        state = self.endpoints[endpoint]
+        start = time.monotonic()
+        with self.condition:
+            while state['in_flight'] >= int(state['concurrency_limit']):
+                self.condition.wait()
+            state['in_flight'] += 1
+        state['bucket'].acquire()
+        with self.condition:
+            state['permits_granted'] += 1
+            state['wait_time'] += time.monotonic() - start
+
+    def _release(self, endpoint: str, throttled: bool):
+        state = self.endpoints[endpoint]
+        with self.condition:
+            state['in_flight'] -= 1
+            if throttled:
+                state['throttles'] += 1
+                state['concurrency_limit'] = max(1.0, state['concurrency_limit'] / 2)
+            else:
+                state['concurrency_limit'] = min(
+                    self.max_concurrency,
+                    state['concurrency_limit'] + 1.0 / state['concurrency_limit']
+                )
+            self.condition.notify_all()
+
+    def call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """
+        Call func through the endpoint's budget, retrying throttle errors with backoff.
+        Non-throttle errors, and throttles after max_attempts, are re-raised.
+        """
+        delay = self.base_delay
+        for attempt in range(1, self.max_attempts + 1):
+            self._acquire(endpoint)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                self._release(endpoint, throttled)
+                if not throttled or attempt == self.max_attempts:
+                    raise
+                # Decorrelated jitter: the next delay depends on the previous one, not the attempt count
+                delay = min(self.max_delay, random.uniform(self.base_delay, delay * 3))
+                logging.warning(f"Throttled on {endpoint} (attempt {attempt}/{self.max_attempts}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                with self.condition:
+                    self.endpoints[endpoint]['wait_time'] += delay
+                continue
+            self._release(endpoint, False)
+            return result
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Return permits granted, throttles hit and seconds spent waiting, per endpoint."""
+        with self.condition:
+            return {
+                endpoint: {
+                    'permits_granted': state['permits_granted'],
+                    'throttles': state['throttles'],
+                    'wait_time': state['wait_time'],
+                    'concurrency_limit': state['concurrency_limit'],
+                    'in_flight': state['in_flight']
+                }
+                for endpoint, state in self.endpoints.items()
+            }
@@ -0,0 +1,162 @@
+"""
+On-disk response cache for YouTube Data API requests.
+
+Responses are stored content-addressed under a hash of the request method and its normalized
+URL, so re-running a collection over an unchanged window is answered from disk instead of
+spending API quota again.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import httplib2
+
+# Query parameters that identify the caller rather than the request
+IGNORED_PARAMS = {'key', 'quotaUser'}
+
+
+def normalize_uri(uri: str) -> str:
+    """Sort the query parameters and drop the API key so equivalent requests share a cache entry."""
+    parts = urlsplit(uri)
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if name not in IGNORED_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), ''))
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded response cache in a directory.
+
+    Entries expire ttl_seconds after they were stored. When the cache grows beyond max_bytes
+    the least recently used entries (by file mtime, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 86400.0, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _entry_paths(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.tmp'):
+                    yield os.path.join(root, name)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    @staticmethod
+    def make_key(method: str, uri: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {normalize_uri(uri)}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict, bytes]]:
+        """Return (headers, content) for a fresh entry, or None on a miss."""
+        path = self._path(key)
+        with self.lock:
+            try:
+                with open(path, 'rb') as f:
+                    metadata = json.loads(f.readline())
+                    content = f.read()
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if time.time() - metadata['stored_at'] > self.ttl_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            # Mark as recently used for LRU eviction
+            os.utime(path)
+            self.hits += 1
+            return metadata['headers'], content
+
+    def put(self, key: str, headers: Dict, content: bytes):
+        """Store a response, evicting least recently used entries if the cache is over its size limit."""
+        path = self._path(key)
+        metadata = json.dumps({'stored_at': time.time(), 'headers': headers}).encode('utf-8')
+        with self.lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path):
+                    self._remove(path)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(metadata + b'\n')
+                    f.write(content)
+                os.replace(tmp_path, path)
+                self.total_bytes += os.path.getsize(path)
+            except OSError as e:
+                logging.warning(f"Could not write response cache entry {key}: {e}")
+                return
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self.total_bytes -= size
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Evict down to 90% of the limit so eviction does not run on every put
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entry_paths(), key=lambda path: os.path.getmtime(path))
+        for path in entries:
+            if self.total_bytes <= target:
+                break
+            self._remove(path)
+            self.evictions += 1
+
+    def get_metrics(self) -> Dict:
+        """Return hit/miss/eviction counters and the current cache size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size_bytes': self.total_bytes
+            }
+
+
+class CachingHttp(httplib2.Http):
+    """
+    httplib2.Http that answers GET requests from a ResponseCache.
+    Pass it to googleapiclient's build() as http= so every request of the client goes through it.
+    Only successful responses are cached.
+    """
+
+    def __init__(self, response_cache: ResponseCache, **kwargs):
+        super().__init__(**kwargs)
+        self.response_cache = response_cache
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        if method.upper() != 'GET':
+            return super().request(uri, method, body, headers, *args, **kwargs)
+
+        key = ResponseCache.make_key(method, uri)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            response_headers, content = cached
+            return httplib2.Response(response_headers), content
+
+        response, content = super().request(uri, method, body, headers, *args, **kwargs)
+        if response.status == 200:
+            self.response_cache.put(key, dict(response), content)
+        return response, content
@@ -0,0 +1,55 @@
+"""
+Tracks which search result pages have been fully processed, so search cursors only move past
+videos that have actually been through store_video.
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Dict
+
+class SearchProgress:
+    """
+    Saves each keyword's search cursor once every video of a result page has been processed,
+    in page order: a page that finishes before an earlier one waits for it, so a crash never
+    resumes past a page whose videos were not stored yet.
+    Thread-safe: pipelined download and writer workers report videos as they finish.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = defaultdict(deque)  # keyword -> pages not saved yet, in result order
+        self.video_pages = {}  # video_id -> page it was emitted from
+
+    def add_page(self, keyword: str, save: Callable[[], None]) -> Dict:
+        """Register a result page whose cursor is persisted by save() once its videos are done."""
+        page = {'keyword': keyword, 'save': save, 'pending': 0, 'closed': False}
+        with self.lock:
+            self.pages[keyword].append(page)
+        return page
+
+    def add_video(self, page: Dict, video_id: str):
+        """Register a video emitted from page."""
+        with self.lock:
+            page['pending'] += 1
+            self.video_pages[video_id] = page
+
+    def close_page(self, page: Dict):
+        """Mark that every video of page has been emitted."""
+        with self.lock:
+            page['closed'] = True
+            self._save_finished(page['keyword'])
+
+    def video_done(self, video_id: str):
+        """Report that a video has been processed, whether or not it could be stored."""
+        with self.lock:
+            page = self.video_pages.pop(video_id, None)
+            if page is None:
+                return
+            page['pending'] -= 1
+            self._save_finished(page['keyword'])
+
+    def _save_finished(self, keyword: str):
+        # Saved under the lock so a keyword's cursors are written in page order
+        pages = self.pages[keyword]
+        while pages and pages[0]['closed'] and pages[0]['pending'] == 0:
+            pages.popleft()['save']()
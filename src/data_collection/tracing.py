@@ -0,0 +1,176 @@
+"""
+Lightweight span timing for the collection pipeline.
+
+A Tracer times named spans, used as a context manager or a decorator:
+
+    with tracer.span('transcript_fetch'):
+        ...
+
+    @tracer.traced('parse')
+    def parse(...): ...
+
+The tracer is enabled by a trace directory. It then keeps a span timeline and per-span
+sketches, which export() writes out as Chrome trace JSON (for chrome://tracing, Perfetto or
+speedscope) and as an OpenMetrics text file, and records every finished span in the
+CollectionMonitor's stage time sketches. It can also wrap the public methods of an object,
+such as the DatabaseManager; those spans only go to the trace. Without a trace directory,
+spans are no-ops and decorators return the function unchanged.
+"""
+
+import os
+import json
+import time
+import inspect
+import logging
+import threading
+from datetime import datetime, UTC
+from functools import wraps
+from typing import Callable, Optional
+
+from data_collection.latency_sketch import LatencySketch
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class Span:
+    __slots__ = ('tracer', 'name', 'stage_time', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, stage_time: bool = True):
+        self.tracer = tracer
+        self.name = name
+        self.stage_time = stage_time
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._finish(self.name, self.start, time.perf_counter(), self.stage_time)
+        return False
+
+class Tracer:
+    def __init__(self, monitor=None, trace_dir: Optional[str] = None, max_events: int = 1_000_000):
+        """
+        monitor: CollectionMonitor that receives span durations as stage times while tracing.
+        trace_dir: enables tracing; export() writes there.
+        At most max_events spans are kept for the Chrome trace; later ones are only counted.
+        """
+        self.monitor = monitor
+        self.trace_dir = trace_dir
+        self.enabled = trace_dir is not None
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.events = []  # (name, start, end, thread id)
+        self.dropped_events = 0
+        self.sketches = {}  # span name -> LatencySketch
+
+    def span(self, name: str):
+        """Context manager timing the enclosed block as span name."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def _finish(self, name: str, start: float, end: float, stage_time: bool):
+        if stage_time and self.monitor is not None:
+            self.monitor.record_stage_time(name, end - start)
+        with self.lock:
+            sketch = self.sketches.get(name)
+            if sketch is None:
+                sketch = self.sketches[name] = LatencySketch()
+            sketch.add(end - start)
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, end, threading.get_ident()))
+            else:
+                self.dropped_events += 1
+
+    def wrap(self, func: Callable, name: str, stage_time: bool = True) -> Callable:
+        """Return func timed as span name on every call; stage_time=False keeps it out of the monitor."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(self, name, stage_time):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator timing every call of the function (span name defaults to its qualified name)."""
+        def decorator(func: Callable) -> Callable:
+            if not self.enabled:
+                return func
+            return self.wrap(func, name or func.__qualname__)
+        return decorator
+
+    def instrument(self, obj, prefix: str = ''):
+        """
+        Time every public method of obj, as span prefix + method name, when tracing is enabled.
+        These spans are only exported with the trace, not journaled by the monitor.
+        Generator methods and context managers are left alone: only their setup would be timed.
+        """
+        if not self.enabled:
+            return
+        for name, func in inspect.getmembers(type(obj), inspect.isfunction):
+            if name.startswith('_') or inspect.isgeneratorfunction(inspect.unwrap(func)):
+                continue
+            setattr(obj, name, self.wrap(getattr(obj, name), prefix + name, stage_time=False))
+
+    def write_chrome_trace(self, path: str):
+        """Write the span timeline in Chrome trace event format (complete events, microseconds)."""
+        pid = os.getpid()
+        with self.lock:
+            trace_events = [
+                {
+                    'name': name,
+                    'cat': name.split('.')[0],
+                    'ph': 'X',
+                    'ts': (start - self.origin) * 1e6,
+                    'dur': (end - start) * 1e6,
+                    'pid': pid,
+                    'tid': thread_id
+                }
+                for name, start, end, thread_id in self.events
+            ]
+            dropped = self.dropped_events
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': dropped}}, f)
+
+    def write_openmetrics(self, path: str):
+        """Write per-span duration summaries (count, sum, p50/p95/p99) in OpenMetrics text format."""
+        lines = [
+            '# TYPE jre_span_seconds summary',
+            '# UNIT jre_span_seconds seconds',
+            '# HELP jre_span_seconds Duration of traced spans.'
+        ]
+        with self.lock:
+            for name, sketch in sorted(self.sketches.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                for quantile in (0.5, 0.95, 0.99):
+                    lines.append(f'jre_span_seconds{{span="{label}",quantile="{quantile}"}} {sketch.quantile(quantile)}')
+                lines.append(f'jre_span_seconds_sum{{span="{label}"}} {sketch.sum}')
+                lines.append(f'jre_span_seconds_count{{span="{label}"}} {sketch.count}')
+        lines.append('# EOF')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def export(self):
+        """Write the Chrome trace and the OpenMetrics file to the trace directory, if tracing is enabled."""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            stamp = f"{datetime.now(UTC):%Y%m%dT%H%M%S}"
+            trace_path = os.path.join(self.trace_dir, f"trace-{stamp}.json")
+            metrics_path = os.path.join(self.trace_dir, f"spans-{stamp}.om.txt")
+            self.write_chrome_trace(trace_path)
+            self.write_openmetrics(metrics_path)
+            logging.info(f"Wrote span trace to {trace_path} and span metrics to {metrics_path}")
+        except OSError as e:
+            logging.error(f"Error exporting span trace: {e}")
@@ -0,0 +1,139 @@
+"""
+Raw transcript archive: every fetched transcript as zstd-compressed Parquet, partitioned by publish year.
+
+The archive lets re-processing and analysis read the raw corpus back at disk speed, without
+the YouTube API or the database. Layout (Hive-style partitions, readable with pyarrow.dataset):
+
+    raw_transcripts/year=2020/part-<timestamp>-<id>.parquet
+
+One row per caption segment. A video that is processed again is appended again; readers keep
+the rows with the latest fetch_date. Rows are buffered in memory until a part file is written,
+and on_written is told which videos a written file holds, so the caller can re-archive the
+videos whose buffered rows were lost (see JRETranscriptFetcher.backfill_archive).
+"""
+
+import os
+import uuid
+import atexit
+import logging
+import threading
+from datetime import datetime, UTC
+from typing import Callable, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # The archive is optional; the fetcher runs without it
+    pa = None
+    pq = None
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw_transcripts')
+
+ARCHIVE_SCHEMA = pa.schema([
+    ('video_id', pa.string()),
+    ('start', pa.float64()),
+    ('duration', pa.float64()),
+    ('text', pa.string()),
+    ('title', pa.string()),
+    ('published_at', pa.timestamp('us', tz='UTC')),
+    ('fetch_date', pa.timestamp('us', tz='UTC'))
+]) if pa else None
+
+# Columns repeated for every segment of a video; dictionary encoding stores them once per row group
+DICTIONARY_COLUMNS = ['video_id', 'title', 'published_at', 'fetch_date']
+
+
+def _parse_published_at(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        published_at = value
+    elif value:
+        try:
+            published_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if published_at.tzinfo is None:
+        return published_at.replace(tzinfo=UTC)
+    return published_at.astimezone(UTC)
+
+
+class TranscriptArchive:
+    """
+    Buffers transcripts per publish year and writes them as Parquet part files.
+    Thread-safe: writer workers of the pipelined collector can add transcripts concurrently.
+    """
+
+    def __init__(self, archive_dir: str = DEFAULT_ARCHIVE_DIR, rows_per_file: int = 250_000,
+                 compression_level: int = 6, on_written: Optional[Callable[[List[str]], None]] = None):
+        """on_written(video_ids) is called after each part file is written, with the videos it holds."""
+        if pa is None:
+            raise ImportError("pyarrow is required for the transcript archive")
+        self.archive_dir = archive_dir
+        self.rows_per_file = rows_per_file
+        self.compression_level = compression_level
+        self.on_written = on_written
+        self.lock = threading.Lock()
+        self.buffers = {}  # year -> column lists
+        self.buffered_rows = {}  # year -> row count
+        # Videos are committed as processed before their rows are written, so never drop the buffer
+        atexit.register(self.flush)
+
+    def add(self, video_data: Dict, transcript: List[Dict]):
+        """Buffer a video's transcript; a year's buffer is written out once it holds rows_per_file rows."""
+        published_at = _parse_published_at(video_data.get('published_at'))
+        year = published_at.year if published_at else 0
+        fetch_date = datetime.now(UTC)
+        count = len(transcript)
+
+        with self.lock:
+            columns = self.buffers.setdefault(year, {name: [] for name in ARCHIVE_SCHEMA.names})
+            columns['video_id'].extend([video_data['video_id']] * count)
+            columns['start'].extend(segment['start'] for segment in transcript)
+            columns['duration'].extend(segment['duration'] for segment in transcript)
+            columns['text'].extend(segment['text'] for segment in transcript)
+            columns['title'].extend([video_data.get('title')] * count)
+            columns['published_at'].extend([published_at] * count)
+            columns['fetch_date'].extend([fetch_date] * count)
+            self.buffered_rows[year] = self.buffered_rows.get(year, 0) + count
+
+            if self.buffered_rows[year] < self.rows_per_file:
+                return
+            columns = self._take_buffer(year)
+        self._write(year, columns)
+
+    def _take_buffer(self, year: int) -> Dict[str, List]:
+        self.buffered_rows.pop(year, None)
+        return self.buffers.pop(year)
+
+    def _write(self, year: int, columns: Dict[str, List]):
+        table = pa.Table.from_pydict(columns, schema=ARCHIVE_SCHEMA)
+        partition_dir = os.path.join(self.archive_dir, f"year={year}")
+        os.makedirs(partition_dir, exist_ok=True)
+        filename = f"part-{datetime.now(UTC):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        path = os.path.join(partition_dir, filename)
+        # Write to a temporary name so readers never see a partial file
+        tmp_path = path + '.tmp'
+        pq.write_table(
+            table, tmp_path,
+            compression='zstd',
+            compression_level=self.compression_level,
+            use_dictionary=DICTIONARY_COLUMNS
+        )
+        os.replace(tmp_path, path)
+        logging.info(f"Archived {table.num_rows} transcript segments to {path}")
+        if self.on_written:
+            try:
+                self.on_written(list(dict.fromkeys(columns['video_id'])))
+            except Exception as e:
+                logging.error(f"Error recording archived videos for {path}: {e}")
+
+    def flush(self):
+        """Write out every buffered transcript."""
+        with self.lock:
+            pending = [(year, self._take_buffer(year)) for year in list(self.buffers)]
+        for year, columns in pending:
+            try:
+                self._write(year, columns)
+            except Exception as e:
+                logging.error(f"Error archiving {len(columns['video_id'])} transcript segments for {year}: {e}")
@@ -5,8 +5,13 @@ Script to fetch transcripts from Joe Rogan Experience YouTube videos and store t
 import os
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+import threading
+import queue
+import itertools
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple, Iterable, Iterator
+from datetime import datetime, timedelta, UTC
 from youtube_transcript_api import YouTubeTranscriptApi
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -19,6 +24,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.db_manager import DatabaseManager
 from data_collection.data_quality import DataQualityChecker
 from data_collection.collection_monitor import CollectionMonitor
+from data_collection.rate_limiter import AdaptiveRateLimiter
+from data_collection.response_cache import CachingHttp, ResponseCache
+from data_collection.transcript_archive import DEFAULT_ARCHIVE_DIR, TranscriptArchive
+from data_collection.keyword_matcher import KeywordMatcher, POLITICAL_KEYWORDS
+from data_collection.tracing import Tracer
+from data_collection.metrics_exporter import MetricsExporter
+from data_collection.search_progress import SearchProgress
 
 # Set up logging directory
 logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
@@ -36,41 +48,101 @@ logging.basicConfig(
 
 load_dotenv()
 
+# videos().list accepts at most 50 IDs per request
+VIDEO_DETAILS_BATCH_SIZE = 50
+
+# search().list returns at most 50 results per page
+SEARCH_PAGE_SIZE = 50
+
+# Publication window of the full sweep
+SEARCH_PUBLISHED_AFTER = datetime(2017, 1, 1, tzinfo=UTC)
+SEARCH_PUBLISHED_BEFORE = datetime(2025, 1, 1, tzinfo=UTC)
+
+# Videos that could not be processed are retried by incremental runs: at most RETRY_BATCH_SIZE
+# per run, RETRY_BACKOFF after the first failure (doubling after each one), RETRY_MAX_ATTEMPTS times
+RETRY_BATCH_SIZE = 20
+RETRY_BACKOFF = timedelta(days=1)
+RETRY_MAX_ATTEMPTS = 5
+
+# Requests per second allowed for each API endpoint, shared by all workers
+RATE_LIMIT_BUDGETS = {
+    'search': 1.0,
+    'videos': 5.0,
+    'transcript': 1.0
+}
+
+# Data API quota units charged per call; the transcript API has no quota
+API_QUOTA_COSTS = {
+    'search': 100,
+    'videos': 1
+}
+
+def _response_cache() -> Optional[ResponseCache]:
+    """Data API response cache configured from the environment; disabled unless YOUTUBE_CACHE_DIR is set."""
+    cache_dir = os.getenv('YOUTUBE_CACHE_DIR')
+    if not cache_dir:
+        return None
+    return ResponseCache(
+        cache_dir,
+        ttl_seconds=float(os.getenv('YOUTUBE_CACHE_TTL', '86400')),
+        max_bytes=int(os.getenv('YOUTUBE_CACHE_MAX_MB', '512')) * 1024 * 1024
+    )
+
+def _transcript_archive(on_written: Callable[[List[str]], None]) -> Optional[TranscriptArchive]:
+    """Raw transcript archive in TRANSCRIPT_ARCHIVE_DIR (default data/raw_transcripts), if pyarrow is installed."""
+    try:
+        return TranscriptArchive(os.getenv('TRANSCRIPT_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR), on_written=on_written)
+    except ImportError as e:
+        logging.warning(f"Raw transcript archive disabled: {e}")
+        return None
+
+def _metrics_exporter() -> Optional[MetricsExporter]:
+    """Prometheus metrics endpoint on METRICS_PORT (bound to METRICS_HOST, default 127.0.0.1); disabled unless set."""
+    port = os.getenv('METRICS_PORT')
+    if not port:
+        return None
+    try:
+        return MetricsExporter(int(port), os.getenv('METRICS_HOST', '127.0.0.1')).start()
+    except (OSError, ValueError) as e:
+        logging.error(f"Metrics endpoint disabled: {e}")
+        return None
+
 class JRETranscriptFetcher:
-    def __init__(self, test_mode: bool = False):
+    def __init__(self, test_mode: bool = False, search_workers: int = 1):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Identical search/videos requests are answered from disk when a cache is configured
+        self.response_cache = _response_cache()
+        self.youtube = self._build_youtube()
         self.channel_id = "UCnxGkOGNMqQEUMvroOWps6Q"  # JRE Clips channel ID
         self.db = DatabaseManager()
         self.quality_checker = DataQualityChecker(self.db)
-        self.monitor = CollectionMonitor(self.db)
+        # Optional /metrics endpoint for watching long backfills
+        self.metrics = _metrics_exporter()
+        self.monitor = CollectionMonitor(self.db, metrics=self.metrics)
+        # TRACE_DIR times pipeline stages (also kept by the monitor) and every database call, and exports a trace
+        self.tracer = Tracer(self.monitor, trace_dir=os.getenv('TRACE_DIR'))
+        self.tracer.instrument(self.db, prefix='db.')
+        # Fetched transcripts are also archived as Parquet for offline re-processing and analysis;
+        # videos are marked archived once their rows are on disk (see backfill_archive)
+        self.archive = _transcript_archive(self.db.mark_videos_archived)
         self.test_mode = test_mode
         
+        # Number of keywords searched concurrently; 1 keeps the sequential path
+        self.search_workers = max(1, search_workers)
+        self._thread_local = threading.local()
+        
+        # Every Data API and transcript API call goes through this limiter
+        budgets = dict(RATE_LIMIT_BUDGETS)
+        if test_mode:
+            budgets['search'] = 0.5
+        self.rate_limiter = AdaptiveRateLimiter(budgets)
+        if self.metrics:
+            self._add_api_collectors()
+        
         # Enhanced political keywords organized by category
-        self.political_keywords = {
-            'core_politics': [
-                "politics", "political", "election", "democracy", "government",
-                "policy", "legislation", "congress", "senate", "house"
-            ],
-            'parties_ideologies': [
-                "democrat", "republican", "liberal", "conservative",
-                "libertarian", "progressive", "left wing", "right wing",
-                "socialist", "capitalist"
-            ],
-            'political_figures': [
-                "trump", "biden", "obama", "clinton", "sanders", "warren",
-                "pence", "harris", "pelosi", "mcconnell"
-            ],
-            'policy_issues': [
-                "immigration", "healthcare", "climate change", "foreign policy",
-                "censorship", "free speech", "gun control", "abortion",
-                "taxation", "welfare"
-            ],
-            'cultural_issues': [
-                "woke", "cancel culture", "identity politics", "social justice",
-                "critical race theory", "gender", "equality", "diversity"
-            ]
-        }
+        self.political_keywords = POLITICAL_KEYWORDS
+        # Compiled once; scores title+description or full transcripts in a single pass
+        self.keyword_matcher = KeywordMatcher(self.political_keywords)
         
         # Test mode keywords (subset for testing)
         self.test_keywords = [
@@ -79,24 +151,61 @@ class JRETranscriptFetcher:
             "immigration", "healthcare"  # policy_issues
         ]
         
+    def _add_api_collectors(self):
+        """Export API call counts, read from the rate limiter (and response cache) at scrape time."""
+        def api_calls():
+            return [({'endpoint': endpoint}, metrics['permits_granted'])
+                    for endpoint, metrics in self.rate_limiter.get_metrics().items()]
+        
+        def quota_units():
+            return [({'endpoint': endpoint}, metrics['permits_granted'] * API_QUOTA_COSTS[endpoint])
+                    for endpoint, metrics in self.rate_limiter.get_metrics().items()
+                    if endpoint in API_QUOTA_COSTS]
+        
+        def throttles():
+            return [({'endpoint': endpoint}, metrics['throttles'])
+                    for endpoint, metrics in self.rate_limiter.get_metrics().items()]
+        
+        self.metrics.add_collector('jre_api_calls_total', 'counter', 'API calls made, including retries.', api_calls)
+        self.metrics.add_collector(
+            'jre_api_quota_units_total', 'counter',
+            'Data API quota units consumed, estimated from calls (search=100, videos=1). '
+            'Calls answered by the response cache are included; see jre_api_cache_hits_total.',
+            quota_units
+        )
+        self.metrics.add_collector('jre_api_throttles_total', 'counter', 'API calls throttled.', throttles)
+        if self.response_cache:
+            self.metrics.add_collector(
+                'jre_api_cache_hits_total', 'counter', 'Data API calls answered by the response cache.',
+                lambda: [({}, self.response_cache.get_metrics()['hits'])]
+            )
+
+    def _build_youtube(self):
+        """Build a YouTube Data API client, backed by the response cache if one is configured."""
+        if self.response_cache:
+            return build('youtube', 'v3', developerKey=self.api_key, http=CachingHttp(self.response_cache))
+        return build('youtube', 'v3', developerKey=self.api_key)
+
+    def _thread_youtube(self):
+        """
+        Get a YouTube client for the current worker thread.
+        googleapiclient service objects are not thread-safe, so each worker builds its own.
+        """
+        youtube = getattr(self._thread_local, 'youtube', None)
+        if youtube is None:
+            youtube = self._build_youtube()
+            self._thread_local.youtube = youtube
+        return youtube
+
     def get_transcript_with_backoff(self, video_id: str) -> Optional[List[Dict]]:
         """
-        Attempt to get transcript with exponential backoff for rate limiting.
+        Get a transcript through the shared rate limiter, which backs off with jitter when throttled.
         """
-        max_attempts = 3
-        attempt = 0
-        while attempt < max_attempts:
-            try:
-                return YouTubeTranscriptApi.get_transcript(video_id)
-            except Exception as e:
-                if "too many requests" in str(e).lower():
-                    wait_time = (2 ** attempt) * 1  # 1, 2, 4 seconds
-                    time.sleep(wait_time)
-                    attempt += 1
-                else:
-                    logging.error(f"Transcript error for {video_id}: {str(e)}")
-                    return None
-        return None
+        try:
+            return self.rate_limiter.call('transcript', YouTubeTranscriptApi.get_transcript, video_id)
+        except Exception as e:
+            logging.error(f"Transcript error for {video_id}: {str(e)}")
+            return None
 
     def extract_episode_number(self, title: str) -> Optional[int]:
         """Extract episode number from video title."""
@@ -136,162 +245,472 @@ class JRETranscriptFetcher:
         """
         score = 0.0
         matching_categories = []
-        text = f"{title} {description}".lower()
+        matches = self.keyword_matcher.match(f"{title} {description}")
         
-        for category, keywords in self.political_keywords.items():
-            matches = sum(1 for keyword in keywords if keyword.lower() in text)
-            if matches > 0:
-                score += matches * 0.2  # Each match adds 0.2 to the score
+        for category in self.political_keywords:
+            if category in matches:
+                score += len(matches[category]) * 0.2  # Each matched keyword adds 0.2 to the score
                 matching_categories.append(category)
         
         return min(score, 1.0), matching_categories
 
-    def search_political_videos(self, max_results: int = 50) -> List[Dict]:
+    def fetch_video_details(self, video_ids: List[str], youtube=None) -> Dict[str, Dict]:
         """
-        Enhanced search for JRE videos with political content using categorized keywords.
-        Limited to videos from 2017-2025.
+        Resolve video details for a list of IDs using batched videos().list calls.
+        Returns a dict mapping video_id to the API item; IDs the API does not return are omitted.
         """
-        videos = []
-        seen_video_ids = set()
+        youtube = youtube or self.youtube
+        details = {}
+        for i in range(0, len(video_ids), VIDEO_DETAILS_BATCH_SIZE):
+            batch = video_ids[i:i + VIDEO_DETAILS_BATCH_SIZE]
+            try:
+                request = youtube.videos().list(
+                    part="statistics,contentDetails,snippet",
+                    id=",".join(batch)
+                )
+                video_response = self.rate_limiter.call('videos', request.execute)
+            except Exception as e:
+                logging.error(f"Error getting additional details for videos {batch}: {e}")
+                continue
+            
+            for video_data in video_response.get('items', []):
+                details[video_data['id']] = video_data
+        return details
+
+    def build_video_info(self, video_data: Dict) -> Optional[Dict]:
+        """
+        Score a videos().list item and build the video_info dict stored in the database.
+        Returns None if the video is not politically relevant.
+        """
+        video_id = video_data['id']
+        stats = video_data['statistics']
+        snippet = video_data['snippet']
         
-        # Use test keywords in test mode, all keywords otherwise
-        keywords = self.test_keywords if self.test_mode else [
-            kw for category in self.political_keywords.values() for kw in category
-        ]
+        # Calculate political score and matching categories
+        political_score, matching_categories = self.calculate_political_score(
+            snippet['title'],
+            snippet['description']
+        )
         
-        # Adjust max_results and rate limiting based on test mode
-        max_results = 5 if self.test_mode else max_results
-        search_delay = 2 if self.test_mode else 1
-        error_delay = 10 if self.test_mode else 5
+        # Only include videos with significant political content
+        if political_score < 0.3:  # Threshold for political relevance
+            return None
+        
+        # Extract episode number and guest name
+        episode_number = self.extract_episode_number(snippet['title'])
+        guest_name = self.extract_guest_name(snippet['title'])
+        
+        # Create or get guest first
+        guest = None
+        if guest_name:
+            guest = self.db.get_or_create_guest(guest_name)
+        
+        return {
+            'video_id': video_id,
+            'title': snippet['title'],
+            'published_at': snippet['publishedAt'],
+            'description': snippet['description'],
+            'view_count': int(stats.get('viewCount', 0)),
+            'like_count': int(stats.get('likeCount', 0)),
+            'comment_count': int(stats.get('commentCount', 0)),
+            'duration': video_data['contentDetails']['duration'],
+            'political_score': political_score,
+            'political_categories': matching_categories,
+            'episode_number': episode_number,
+            'guest_id': guest.id if guest else None,
+            'thumbnail_url': snippet['thumbnails']['high']['url'],
+            'tags': snippet.get('tags', []),
+            'category_id': snippet.get('categoryId'),
+            'channel_title': snippet['channelTitle']
+        }
+
+    def _video_info_from_row(self, video) -> Dict:
+        """Rebuild the video_info dict of a stored video (see build_video_info)."""
+        return {
+            'video_id': video.video_id,
+            'title': video.title,
+            'published_at': video.published_at,
+            'description': video.description,
+            'view_count': video.view_count,
+            'like_count': video.like_count,
+            'comment_count': video.comment_count,
+            'duration': video.duration,
+            'political_score': video.political_score,
+            'political_categories': video.political_categories,
+            'episode_number': video.episode_number,
+            'guest_id': video.guest_id,
+            'thumbnail_url': video.thumbnail_url,
+            'tags': video.tags,
+            'category_id': video.category_id,
+            'channel_title': video.channel_title
+        }
+
+    def _keep_for_retry(self, video_data: Dict):
+        """
+        Store a video that could not be processed as an unprocessed row and count the attempt.
+        Incremental searches skip known videos and move their high-water marks past it, so it is
+        retried from the database (see RETRY_MAX_ATTEMPTS).
+        """
+        if video_data.get('video_id'):
+            # add_video modifies its argument; an existing row is left as it is
+            self.db.add_video(dict(video_data))
+            self.db.record_failed_attempt(video_data['video_id'])
+
+    def search_keyword(self, keyword: str, max_results: int, youtube=None,
+                       published_after: datetime = SEARCH_PUBLISHED_AFTER,
+                       published_before: datetime = SEARCH_PUBLISHED_BEFORE,
+                       page_token: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Run a single search().list request for a keyword.
+        Returns the video IDs on the result page, in result order, and the next page token.
+        """
+        youtube = youtube or self.youtube
+        logging.info(f"Searching for videos with keyword: {keyword}")
+        params = {}
+        if page_token:
+            params['pageToken'] = page_token
+        request = youtube.search().list(
+            part="snippet",
+            channelId=self.channel_id,
+            q=keyword,
+            type="video",
+            maxResults=max_results,
+            publishedAfter=published_after.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            publishedBefore=published_before.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            order="relevance",
+            **params
+        )
+        response = self.rate_limiter.call('search', request.execute)
         
-        for keyword in keywords:
+        video_ids = []
+        for item in response['items']:
+            # Check if this is a video result
+            if item['id']['kind'] != 'youtube#video':
+                logging.debug(f"Skipping non-video result: {item['id']['kind']}")
+                continue
+                
+            # Get video ID from the response
+            video_id = item['id']['videoId']
+            if not video_id:
+                logging.warning(f"No videoId found in response item: {item}")
+                continue
+            video_ids.append(video_id)
+        return video_ids, response.get('nextPageToken')
+
+    def _full_sweep_cursor_key(self, keyword: str) -> str:
+        # Full sweeps keep their own cursor so they do not move the incremental high-water mark
+        return f"full:{keyword}"
+
+    def _search_window(self, keyword: str, incremental: bool, resume: bool) -> Tuple[datetime, datetime, Optional[str]]:
+        """
+        Get (published_after, published_before, page_token) for the next search of a keyword.
+        An unfinished sweep resumes from its saved page (for a full search, only with resume).
+        Otherwise an incremental search covers everything published since the keyword's
+        high-water mark, and a full search the whole 2017-2025 window.
+        """
+        if not incremental:
+            cursor = self.db.get_search_cursor(self._full_sweep_cursor_key(keyword)) if resume else None
+            page_token = cursor.next_page_token if cursor else None
+            return SEARCH_PUBLISHED_AFTER, SEARCH_PUBLISHED_BEFORE, page_token
+
+        cursor = self.db.get_search_cursor(keyword)
+        if not cursor or not cursor.published_after:
+            return SEARCH_PUBLISHED_AFTER, datetime.now(UTC), None
+        # Cursor timestamps are stored as naive UTC
+        published_after = cursor.published_after.replace(tzinfo=UTC)
+        if cursor.next_page_token and cursor.window_end:
+            return published_after, cursor.window_end.replace(tzinfo=UTC), cursor.next_page_token
+        return published_after, datetime.now(UTC), None
+
+    def _save_search_progress(self, keyword: str, incremental: bool, published_after: datetime,
+                              published_before: datetime, next_page_token: Optional[str]):
+        """
+        Persist a keyword's cursor after a page's videos have been processed. Once an incremental
+        window is exhausted its high-water mark moves to the window end; a full sweep only keeps
+        a page token while it is in progress, so the next one starts again from the first page.
+        """
+        if not incremental:
+            self.db.save_search_cursor(
+                self._full_sweep_cursor_key(keyword),
+                published_after.replace(tzinfo=None),
+                published_before.replace(tzinfo=None),
+                next_page_token
+            )
+        elif next_page_token:
+            self.db.save_search_cursor(
+                keyword,
+                published_after.replace(tzinfo=None),
+                published_before.replace(tzinfo=None),
+                next_page_token
+            )
+        else:
+            self.db.save_search_cursor(keyword, published_before.replace(tzinfo=None), None, None)
+
+    def _search_keyword_pages(self, keyword: str, max_results: int, incremental: bool, resume: bool, youtube,
+                              claim_video_ids: Callable[[List[str]], List[str]]) -> Iterator[Tuple[List[str], Dict[str, Dict], Callable[[], None]]]:
+        """
+        Follow a keyword's search results page by page, up to max_results results.
+        Yields (video_ids, details, save_progress) per page: the page's video IDs in result
+        order, the details of the ones claimed by claim_video_ids, and a callable persisting
+        the keyword's cursor past the page. Call it once the page's videos have been processed,
+        so a crash resumes from the last unfinished page. A full search without resume neither
+        reads nor saves cursors, and save_progress does nothing.
+        """
+        published_after, published_before, page_token = self._search_window(keyword, incremental, resume)
+        remaining = max_results
+        while remaining > 0:
             try:
-                logging.info(f"Searching for videos with keyword: {keyword}")
-                request = self.youtube.search().list(
-                    part="snippet",
-                    channelId=self.channel_id,
-                    q=keyword,
-                    type="video",
-                    maxResults=max_results,
-                    publishedAfter="2017-01-01T00:00:00Z",
-                    publishedBefore="2025-01-01T00:00:00Z",
-                    order="relevance"
+                video_ids, next_page_token = self.search_keyword(
+                    keyword, min(SEARCH_PAGE_SIZE, remaining), youtube,
+                    published_after=published_after,
+                    published_before=published_before,
+                    page_token=page_token
                 )
-                response = request.execute()
-                
-                for item in response['items']:
-                    # Check if this is a video result
-                    if item['id']['kind'] != 'youtube#video':
-                        logging.debug(f"Skipping non-video result: {item['id']['kind']}")
-                        continue
-                        
-                    # Get video ID from the response
-                    video_id = item['id']['videoId']
-                    if not video_id:
-                        logging.warning(f"No videoId found in response item: {item}")
-                        continue
-                    
-                    # Skip if we've already processed this video
-                    if video_id in seen_video_ids:
-                        continue
-                    seen_video_ids.add(video_id)
-                    
-                    # Get additional video details
-                    try:
-                        video_response = self.youtube.videos().list(
-                            part="statistics,contentDetails,snippet",
-                            id=video_id
-                        ).execute()
-                        
-                        if not video_response['items']:
-                            continue
-                            
-                        video_data = video_response['items'][0]
-                        stats = video_data['statistics']
-                        snippet = video_data['snippet']
-                        
-                        # Calculate political score and matching categories
-                        political_score, matching_categories = self.calculate_political_score(
-                            snippet['title'],
-                            snippet['description']
-                        )
-                        
-                        # Only include videos with significant political content
-                        if political_score < 0.3:  # Threshold for political relevance
-                            continue
-                        
-                        # Extract episode number and guest name
-                        episode_number = self.extract_episode_number(snippet['title'])
-                        guest_name = self.extract_guest_name(snippet['title'])
-                        
-                        # Create or get guest first
-                        guest = None
-                        if guest_name:
-                            guest = self.db.get_or_create_guest(guest_name)
-                        
-                        video_info = {
-                            'video_id': video_id,
-                            'title': snippet['title'],
-                            'published_at': snippet['publishedAt'],
-                            'description': snippet['description'],
-                            'view_count': int(stats.get('viewCount', 0)),
-                            'like_count': int(stats.get('likeCount', 0)),
-                            'comment_count': int(stats.get('commentCount', 0)),
-                            'duration': video_data['contentDetails']['duration'],
-                            'political_score': political_score,
-                            'political_categories': matching_categories,
-                            'episode_number': episode_number,
-                            'guest_id': guest.id if guest else None,
-                            'thumbnail_url': snippet['thumbnails']['high']['url'],
-                            'tags': snippet.get('tags', []),
-                            'category_id': snippet.get('categoryId'),
-                            'channel_title': snippet['channelTitle']
-                        }
-                        
-                        videos.append(video_info)
-                        logging.info(f"Found politically relevant video: {video_info['title']} (Score: {political_score})")
-                        
-                    except Exception as e:
-                        logging.error(f"Error getting additional details for video {video_id}: {e}")
-                
-                # Rate limiting based on test mode
-                time.sleep(search_delay)
-                        
             except HttpError as e:
                 logging.error(f"Error searching for videos with keyword '{keyword}': {e}")
-                time.sleep(error_delay)
-                
-        return videos
+                return
+            remaining -= len(video_ids)
+            
+            # Claim the IDs no other keyword has seen so their details are fetched only once
+            new_video_ids = claim_video_ids(video_ids)
+            
+            if incremental:
+                # Only fetch details for videos we do not have yet
+                existing_video_ids = self.db.get_existing_video_ids(new_video_ids)
+                new_video_ids = [vid for vid in new_video_ids if vid not in existing_video_ids]
+            
+            more_pages = bool(next_page_token and video_ids)
+            # An incremental window stopped at max_results resumes next run; a full sweep that
+            # stopped there is done, and only an interrupted one keeps its page token
+            if incremental:
+                saved_page_token = next_page_token if more_pages else None
+            else:
+                saved_page_token = next_page_token if more_pages and remaining > 0 else None
+            if incremental or resume:
+                save_progress = partial(
+                    self._save_search_progress, keyword, incremental, published_after, published_before, saved_page_token
+                )
+            else:
+                save_progress = lambda: None
+            
+            # Get additional video details for the whole page
+            yield video_ids, self.fetch_video_details(new_video_ids, youtube), save_progress
+            
+            if not more_pages:
+                return
+            page_token = next_page_token
+
+    def _search_keywords(self) -> List[str]:
+        # Use test keywords in test mode, all keywords otherwise
+        return self.test_keywords if self.test_mode else [
+            kw for category in self.political_keywords.values() for kw in category
+        ]
+
+    def _build_relevant_videos(self, video_ids: Iterable[str], details: Dict[str, Dict],
+                               emitted_video_ids: set) -> Iterator[Dict]:
+        """Yield the politically relevant videos among video_ids, skipping IDs already emitted."""
+        for video_id in video_ids:
+            if video_id in emitted_video_ids:
+                continue
+            emitted_video_ids.add(video_id)
+            if video_id not in details:
+                continue
+            
+            try:
+                video_info = self.build_video_info(details[video_id])
+            except Exception as e:
+                logging.error(f"Error getting additional details for video {video_id}: {e}")
+                continue
+            if not video_info:
+                continue
+            
+            logging.info(f"Found politically relevant video: {video_info['title']} (Score: {video_info['political_score']})")
+            yield video_info
+
+    def _emit_page(self, keyword: str, video_ids: List[str], details: Dict[str, Dict],
+                   save_progress: Callable[[], None], emitted_video_ids: set,
+                   progress: Optional[SearchProgress]) -> Iterator[Dict]:
+        """
+        Yield a result page's relevant videos. Without progress the keyword's cursor is saved
+        once they have been consumed; with it, once every one has been reported done.
+        """
+        if progress is None:
+            yield from self._build_relevant_videos(video_ids, details, emitted_video_ids)
+            save_progress()
+            return
+        page = progress.add_page(keyword, save_progress)
+        for video_info in self._build_relevant_videos(video_ids, details, emitted_video_ids):
+            progress.add_video(page, video_info['video_id'])
+            yield video_info
+        progress.close_page(page)
+
+    def iter_political_videos(self, max_results: int = 50, incremental: bool = False, resume: bool = False,
+                              progress: Optional[SearchProgress] = None) -> Iterator[Dict]:
+        """
+        Lazily search for JRE videos with political content, yielding each relevant video as
+        soon as its result page has been fetched.
+        
+        Every keyword follows nextPageToken until it has returned max_results results or
+        runs out of pages. With resume, once a page's videos have been consumed (or, with
+        progress, reported done through progress.video_done) its next page token is persisted,
+        so an interrupted search resumes from there instead of from page one.
+        See search_political_videos for incremental mode.
+        """
+        # Adjust max_results based on test mode
+        max_results = 5 if self.test_mode else max_results
+        
+        seen_video_ids = set()
+        emitted_video_ids = set()
+        
+        def claim_video_ids(video_ids: List[str]) -> List[str]:
+            new_video_ids = [vid for vid in dict.fromkeys(video_ids) if vid not in seen_video_ids]
+            seen_video_ids.update(new_video_ids)
+            return new_video_ids
+        
+        for keyword in self._search_keywords():
+            for video_ids, details, save_progress in self._search_keyword_pages(
+                    keyword, max_results, incremental, resume, self.youtube, claim_video_ids):
+                yield from self._emit_page(keyword, video_ids, details, save_progress, emitted_video_ids, progress)
 
-    def process_videos(self, max_videos: int = 100):
+    def search_political_videos(self, max_results: int = 50, incremental: bool = False, resume: bool = False,
+                                progress: Optional[SearchProgress] = None) -> List[Dict]:
+        """
+        Enhanced search for JRE videos with political content using categorized keywords.
+        Limited to videos from 2017-2025. max_results caps the results read per keyword,
+        following as many result pages as needed.
+        
+        When search_workers > 1 the keywords are searched concurrently; the returned
+        list is the same as the sequential path.
+        
+        In incremental mode each keyword only searches videos published since its persisted
+        high-water mark (up to now), resuming an unfinished sweep from its saved page token,
+        and videos already in the database are skipped before their details are fetched.
+        
+        Incremental searches, and full ones with resume, save their search cursors once the
+        videos are returned, or with progress, once they have been reported done through
+        progress.video_done. A full search without resume does not use the search cursors.
+        """
+        if self.search_workers <= 1:
+            return list(self.iter_political_videos(max_results, incremental=incremental, resume=resume, progress=progress))
+        
+        # Adjust max_results based on test mode
+        max_results = 5 if self.test_mode else max_results
+        
+        # Shared across workers to dedupe video IDs
+        seen_video_ids = set()
+        seen_lock = threading.Lock()
+        details = {}
+        
+        def claim_video_ids(video_ids: List[str]) -> List[str]:
+            with seen_lock:
+                new_video_ids = [vid for vid in dict.fromkeys(video_ids) if vid not in seen_video_ids]
+                seen_video_ids.update(new_video_ids)
+            return new_video_ids
+        
+        def search_worker(keyword: str) -> List[Tuple[List[str], Callable[[], None]]]:
+            pages = []
+            for video_ids, page_details, save_progress in self._search_keyword_pages(
+                    keyword, max_results, incremental, resume, self._thread_youtube(), claim_video_ids):
+                pages.append((video_ids, save_progress))
+                details.update(page_details)
+            return pages
+        
+        keywords = self._search_keywords()
+        with ThreadPoolExecutor(max_workers=self.search_workers) as executor:
+            results = list(executor.map(search_worker, keywords))
+        
+        # Assemble in keyword order so the result matches a sequential sweep
+        emitted_video_ids = set()
+        return [
+            video_info
+            for keyword, pages in zip(keywords, results)
+            for video_ids, save_progress in pages
+            for video_info in self._emit_page(keyword, video_ids, details, save_progress, emitted_video_ids, progress)
+        ]
+
+    def process_videos(self, max_videos: int = 100, pipelined: bool = False,
+                       download_workers: int = 4, writer_workers: int = 1,
+                       queue_size: int = 16, incremental: bool = False, resume: bool = True):
         """
         Main function to process videos and store in database.
+        
+        With pipelined=True, transcripts are downloaded by a pool of download_workers
+        and handed to writer_workers through a queue of at most queue_size transcripts,
+        so downloads and database writes overlap while memory stays bounded.
+        With incremental=True only videos published since the last run are searched
+        (see search_political_videos). Videos that could not be processed are kept as
+        unprocessed rows, and incremental runs retry those that are due before searching.
+        
+        Videos are processed as search result pages arrive (see iter_political_videos), so
+        max_videos caps the results read per keyword. With resume (the default) an interrupted
+        full sweep continues from its saved page; a page's search cursor is only saved once all
+        of its videos have been through store_video.
         """
         # Initialize database if needed
         self.db.init_db()
+        self.backfill_archive()
+        
+        # Search for political videos; concurrent search workers return the whole list at once
+        progress = SearchProgress()
+        if self.search_workers > 1:
+            videos = iter(self.search_political_videos(max_videos, incremental=incremental, resume=resume, progress=progress))
+        else:
+            videos = self.iter_political_videos(max_videos, incremental=incremental, resume=resume, progress=progress)
+        if incremental:
+            retry_videos = [
+                self._video_info_from_row(video)
+                for video in self.db.get_unprocessed_videos(RETRY_MAX_ATTEMPTS, RETRY_BACKOFF, RETRY_BATCH_SIZE)
+            ]
+            if retry_videos:
+                logging.info(f"Retrying {len(retry_videos)} videos that could not be processed before")
+            videos = itertools.chain(retry_videos, videos)
         
-        # Search for political videos
-        videos = self.search_political_videos(max_videos)
-        if not videos:
+        found = 0
+        def count_found(videos: Iterable[Dict]) -> Iterator[Dict]:
+            nonlocal found
+            for video in videos:
+                found += 1
+                yield video
+        
+        # Process each video; buffered archive rows and stats are written out even if processing is interrupted
+        try:
+            if pipelined:
+                self.process_videos_pipelined(
+                    count_found(videos),
+                    download_workers=download_workers,
+                    writer_workers=writer_workers,
+                    queue_size=queue_size,
+                    on_video_done=progress.video_done
+                )
+            else:
+                successful = 0
+                for i, video in enumerate(count_found(videos), 1):
+                    logging.info(f"\nProcessing video {i}")
+                    try:
+                        if self.process_video(video):
+                            successful += 1
+                        else:
+                            logging.error(f"Failed to process video {video.get('video_id', 'unknown')}: {video.get('title', 'unknown title')}")
+                            self._keep_for_retry(video)
+                    except Exception as e:
+                        logging.error(f"Error processing video {video.get('video_id', 'unknown')}: {str(e)}")
+                        logging.error(f"Video data: {video}")
+                        self.monitor.record_error("processing_error", video.get('video_id', 'unknown'))
+                        self._keep_for_retry(video)
+                    progress.video_done(video.get('video_id'))
+        finally:
+            if self.archive:
+                self.archive.flush()
+            self.monitor.flush()
+        
+        self.tracer.export()
+        # Bring the dashboard view of guest statistics up to date (PostgreSQL only)
+        self.db.refresh_guest_stats()
+        
+        if not found:
             logging.warning("No videos found to process")
             return
-            
-        logging.info(f"\nFound {len(videos)} potentially relevant videos")
-        
-        # Process each video
-        successful = 0
-        for i, video in enumerate(videos, 1):
-            logging.info(f"\nProcessing video {i}/{len(videos)}")
-            try:
-                if self.process_video(video):
-                    successful += 1
-                else:
-                    logging.error(f"Failed to process video {video.get('video_id', 'unknown')}: {video.get('title', 'unknown title')}")
-            except Exception as e:
-                logging.error(f"Error processing video {video.get('video_id', 'unknown')}: {str(e)}")
-                logging.error(f"Video data: {video}")
-                self.monitor.record_error("processing_error", video.get('video_id', 'unknown'))
-            time.sleep(1)  # Rate limiting
+        logging.info(f"\nFound {found} potentially relevant videos")
         
         # Generate final report
         summary = self.monitor.get_collection_summary()
@@ -300,6 +719,23 @@ class JRETranscriptFetcher:
         logging.info(f"Successfully processed: {summary['processed_videos']}")
         logging.info(f"Success rate: {summary['success_rate']}")
         logging.info(f"Total segments collected: {summary['total_segments']}")
+        for stage, stats in [('total', summary['processing_time_stats']), *summary['stage_time_stats'].items()]:
+            if stats['count']:
+                logging.info(
+                    f"Time {stage}: p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, "
+                    f"p99 {stats['p99']:.3f}s, max {stats['max']:.3f}s ({stats['count']} samples)"
+                )
+        for endpoint, metrics in self.rate_limiter.get_metrics().items():
+            logging.info(
+                f"API {endpoint}: {metrics['permits_granted']} calls, {metrics['throttles']} throttled, "
+                f"{metrics['wait_time']:.1f}s waiting"
+            )
+        if self.response_cache:
+            cache_metrics = self.response_cache.get_metrics()
+            logging.info(
+                f"API response cache: {cache_metrics['hits']} hits, {cache_metrics['misses']} misses "
+                f"({cache_metrics['hit_rate']:.0%} hit rate), {cache_metrics['evictions']} evictions"
+            )
         
         # Check for duplicates
         duplicates = self.quality_checker.check_duplicate_videos()
@@ -308,39 +744,194 @@ class JRETranscriptFetcher:
             for group in duplicates:
                 logging.warning(f"Duplicate group: {[v.title for v in group['videos']]}")
 
-    def process_video(self, video_data: Dict) -> bool:
+    def process_videos_pipelined(self, videos: Iterable[Dict], download_workers: int = 4,
+                                 writer_workers: int = 1, queue_size: int = 16,
+                                 on_video_done: Optional[Callable[[str], None]] = None) -> int:
         """
-        Process a single video: fetch transcript and store in database.
-        Returns True if successful, False otherwise.
+        Process videos with overlapping download and storage stages.
+        Download workers fetch transcripts and put them on a bounded queue; writer workers
+        drain it through store_video. A full queue blocks the downloaders (backpressure).
+        on_video_done(video_id) is called once a video has been stored, skipped or has failed.
+        Returns the number of successfully processed videos. An error raised by videos (such as
+        a failed search request) stops the downloaders and is re-raised once the transcripts
+        already queued have been stored.
         """
-        video_id = video_data.get('video_id')
-        if not video_id:
-            logging.error("No video_id provided in video_data")
-            return False
-            
-        start_time = time.time()
+        video_iter = iter(videos)
+        video_iter_lock = threading.Lock()
+        video_iter_errors = []
+        stop_downloads = threading.Event()
+        transcript_queue = queue.Queue(maxsize=queue_size)
+        successful = 0
+        successful_lock = threading.Lock()
+        
+        def record_success():
+            nonlocal successful
+            with successful_lock:
+                successful += 1
         
+        def video_done(video_id: str):
+            if on_video_done:
+                on_video_done(video_id)
+        
+        def download_worker():
+            while True:
+                with video_iter_lock:
+                    if stop_downloads.is_set():
+                        return
+                    try:
+                        video = next(video_iter, None)
+                    except Exception as e:
+                        logging.error(f"Error reading videos to process: {str(e)}")
+                        video_iter_errors.append(e)
+                        stop_downloads.set()
+                        return
+                if video is None:
+                    return
+                video_id = video.get('video_id')
+                if not video_id:
+                    logging.error("No video_id provided in video_data")
+                    continue
+                try:
+                    start_time = time.time()
+                    already_processed, transcript = self.fetch_transcript_for_video(video_id)
+                    if already_processed:
+                        record_success()
+                    elif transcript:
+                        transcript_queue.put((video, transcript, start_time))
+                        continue
+                    else:
+                        self._keep_for_retry(video)
+                except Exception as e:
+                    logging.error(f"Error downloading transcript for video {video_id}: {str(e)}")
+                    self.monitor.record_error("processing_error", video_id)
+                    self._keep_for_retry(video)
+                video_done(video_id)
+        
+        def writer_worker():
+            while True:
+                item = transcript_queue.get()
+                if item is None:
+                    return
+                video, transcript, start_time = item
+                try:
+                    if self.store_video(video, transcript, start_time):
+                        record_success()
+                    else:
+                        logging.error(f"Failed to process video {video['video_id']}: {video.get('title', 'unknown title')}")
+                        self._keep_for_retry(video)
+                except Exception as e:
+                    logging.error(f"Error processing video {video['video_id']}: {str(e)}")
+                    logging.error(f"Video data: {video}")
+                    self.monitor.record_error("processing_error", video['video_id'])
+                    self._keep_for_retry(video)
+                video_done(video['video_id'])
+        
+        downloaders = [threading.Thread(target=download_worker, daemon=True) for _ in range(max(1, download_workers))]
+        writers = [threading.Thread(target=writer_worker, daemon=True) for _ in range(max(1, writer_workers))]
+        for thread in downloaders + writers:
+            thread.start()
+        for thread in downloaders:
+            thread.join()
+        # All transcripts are queued; tell each writer to stop once the queue is drained
+        for _ in writers:
+            transcript_queue.put(None)
+        for thread in writers:
+            thread.join()
+        if video_iter_errors:
+            raise video_iter_errors[0]
+        
+        logging.info(f"Pipelined processing finished: {successful} videos processed successfully")
+        return successful
+
+    def backfill_archive(self, videos_per_batch: int = 100) -> int:
+        """
+        Archive the stored transcripts of processed videos that are not in the raw transcript
+        archive, such as those whose buffered rows were lost when a run was killed.
+        Returns the number of videos archived.
+        """
+        if not self.archive:
+            return 0
+        archived = 0
+        segments = self.db.iter_unarchived_transcript_segments(videos_per_batch)
+        for video_id, rows in itertools.groupby(segments, key=lambda row: row.video_id):
+            video = self.db.get_video(video_id)
+            if not video:
+                continue
+            self.archive.add(
+                {'video_id': video_id, 'title': video.title, 'published_at': video.published_at},
+                [{'start': row.start_time, 'duration': row.duration, 'text': row.text} for row in rows]
+            )
+            archived += 1
+        if archived:
+            self.archive.flush()
+            logging.info(f"Archived the stored transcripts of {archived} videos missing from the archive")
+        return archived
+
+    def fetch_transcript_for_video(self, video_id: str) -> Tuple[bool, Optional[List[Dict]]]:
+        """
+        Download stage of process_video: skip processed videos, clear stale rows and fetch the transcript.
+        Returns (already_processed, transcript); transcript is None if it could not be fetched.
+        """
         # Check if video already exists in database
         existing_video = self.db.get_video(video_id)
         if existing_video:
             if existing_video.is_processed:
                 logging.info(f"Video {video_id} already exists and is processed, skipping...")
-                return True
+                return True, None
             else:
+                # ingest_video replaces the stale row and segments when the video is stored
                 logging.info(f"Video {video_id} exists but not processed, reprocessing...")
-                # Delete existing video to start fresh
-                self.db.delete_video(video_id)
         
         # Get transcript
-        transcript = self.get_transcript_with_backoff(video_id)
+        with self.tracer.span('transcript_fetch'):
+            transcript = self.get_transcript_with_backoff(video_id)
         if not transcript:
             logging.error(f"No transcript available for video {video_id}")
             self.monitor.record_error("no_transcript", video_id)
+            return False, None
+        return False, transcript
+
+    def process_video(self, video_data: Dict) -> bool:
+        """
+        Process a single video: fetch transcript and store in database.
+        Returns True if successful, False otherwise.
+        """
+        video_id = video_data.get('video_id')
+        if not video_id:
+            logging.error("No video_id provided in video_data")
             return False
+            
+        start_time = time.time()
         
-        # Store video in database
+        already_processed, transcript = self.fetch_transcript_for_video(video_id)
+        if already_processed:
+            return True
+        if not transcript:
+            return False
+        return self.store_video(video_data, transcript, start_time)
+
+    def store_video(self, video_data: Dict, transcript: List[Dict], start_time: float) -> bool:
+        """
+        Storage stage of process_video: run quality checks in memory, then store the video,
+        its transcript and its processed flag in one transaction, then archive the raw transcript.
+        start_time is when processing of the video began.
+        Returns True if successful, False otherwise.
+        """
+        video_id = video_data['video_id']
+        
+        # Check the transcript before it is stored
         try:
-            video = self.db.add_video(video_data)
+            with self.tracer.span('quality_checks.transcript'):
+                is_complete, transcript_issues = self.quality_checker.check_transcript(transcript)
+        except Exception as e:
+            logging.error(f"Error running quality checks for video {video_id}: {str(e)}")
+            self.monitor.record_error("quality_check_error", video_id)
+            is_complete, transcript_issues = True, {}
+        
+        # Store video, segments and processed flag atomically
+        try:
+            with self.tracer.span('db_ingest'):
+                video = self.db.ingest_video(video_data, transcript)
             if not video:
                 logging.error(f"Failed to add video {video_id} to database")
                 self.monitor.record_error("database_error", video_id)
@@ -351,18 +942,19 @@ class JRETranscriptFetcher:
             self.monitor.record_error("database_error", video_id)
             return False
         
-        # Store transcript segments
-        try:
-            self.db.add_transcript_segments(video_id, transcript)
-        except Exception as e:
-            logging.error(f"Error storing transcript segments for video {video_id}: {str(e)}")
-            self.monitor.record_error("transcript_error", video_id)
-            return False
+        # Archive the raw transcript
+        if self.archive:
+            try:
+                with self.tracer.span('archive'):
+                    self.archive.add(video_data, transcript)
+            except Exception as e:
+                logging.error(f"Error archiving transcript for video {video_id}: {str(e)}")
+                self.monitor.record_error("archive_error", video_id)
         
-        # Run quality checks
+        # Validate the stored metadata without re-reading it
         try:
-            is_complete, transcript_issues = self.quality_checker.check_transcript_completeness(video_id)
-            is_valid, metadata_issues = self.quality_checker.validate_video_metadata(video_id)
+            with self.tracer.span('quality_checks.metadata'):
+                is_valid, metadata_issues = self.quality_checker.check_video_metadata(video)
             
             if not is_complete or not is_valid:
                 logging.warning(f"Quality issues found for video {video_id}:")
@@ -374,32 +966,18 @@ class JRETranscriptFetcher:
             logging.error(f"Error running quality checks for video {video_id}: {str(e)}")
             self.monitor.record_error("quality_check_error", video_id)
         
-        # Mark as processed and update statistics
-        try:
-            if self.db.mark_video_processed(video_id):
-                # Verify the video was actually marked as processed
-                processed_video = self.db.get_video(video_id)
-                if processed_video and processed_video.is_processed:
-                    processing_time = time.time() - start_time
-                    self.monitor.update_video_processed(
-                        video_id,
-                        success=True,
-                        segment_count=len(transcript),
-                        processing_time=processing_time
-                    )
-                    logging.info(f"Successfully processed video {video_id}: {video_data.get('title', 'unknown title')}")
-                    return True
-                else:
-                    logging.error(f"Video {video_id} was not properly marked as processed")
-                    self.monitor.record_error("status_verification_error", video_id)
-                    return False
-            else:
-                logging.error(f"Failed to mark video {video_id} as processed")
-                return False
-        except Exception as e:
-            logging.error(f"Error updating video status for {video_id}: {str(e)}")
-            self.monitor.record_error("status_update_error", video_id)
-            return False
+        # Update statistics
+        processing_time = time.time() - start_time
+        self.monitor.update_video_processed(
+            video_id,
+            success=True,
+            segment_count=len(transcript),
+            processing_time=processing_time,
+            video=video,
+            guest_name=self.extract_guest_name(video_data.get('title', '')) if video.guest_id else None
+        )
+        logging.info(f"Successfully processed video {video_id}: {video_data.get('title', 'unknown title')}")
+        return True
 
 if __name__ == "__main__":
     fetcher = JRETranscriptFetcher()
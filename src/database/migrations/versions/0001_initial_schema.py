@@ -0,0 +1,74 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'guests',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False, unique=True),
+        sa.Column('description', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime())
+    )
+    op.create_table(
+        'videos',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.String(), nullable=False, unique=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('channel_title', sa.String()),
+        sa.Column('view_count', sa.Integer()),
+        sa.Column('like_count', sa.Integer()),
+        sa.Column('comment_count', sa.Integer()),
+        sa.Column('duration', sa.String()),
+        sa.Column('episode_number', sa.Integer()),
+        sa.Column('political_score', sa.Float()),
+        sa.Column('political_categories', sa.JSON()),
+        sa.Column('thumbnail_url', sa.String()),
+        sa.Column('tags', sa.JSON()),
+        sa.Column('category_id', sa.String()),
+        sa.Column('is_processed', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.Column('guest_id', sa.Integer(), sa.ForeignKey('guests.id'))
+    )
+    op.create_table(
+        'transcript_segments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('start_time', sa.Float(), nullable=False),
+        sa.Column('duration', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    op.create_table(
+        'political_segments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), nullable=False),
+        sa.Column('segment_text', sa.Text(), nullable=False),
+        sa.Column('start_time', sa.Float(), nullable=False),
+        sa.Column('end_time', sa.Float(), nullable=False),
+        sa.Column('keywords', sa.JSON()),
+        sa.Column('political_categories', sa.JSON()),
+        sa.Column('sentiment_score', sa.Float()),
+        sa.Column('created_at', sa.DateTime())
+    )
+
+def downgrade():
+    op.drop_table('political_segments')
+    op.drop_table('transcript_segments')
+    op.drop_table('videos')
+    op.drop_table('guests')
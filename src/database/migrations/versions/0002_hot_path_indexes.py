@@ -0,0 +1,32 @@
+"""Indexes for the hot query paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # get_transcript_segments / get_political_segments: filter by video, order by start time
+    op.create_index('ix_transcript_segments_video_id_start_time', 'transcript_segments', ['video_id', 'start_time'])
+    op.create_index('ix_political_segments_video_id_start_time', 'political_segments', ['video_id', 'start_time'])
+    # get_videos_by_guest: filter by guest, order by publish date
+    op.create_index('ix_videos_guest_id_published_at', 'videos', ['guest_id', 'published_at'])
+    # get_political_videos and the report counts
+    op.create_index('ix_videos_political_score', 'videos', ['political_score'])
+    op.create_index('ix_videos_published_at', 'videos', ['published_at'])
+    op.create_index('ix_videos_is_processed', 'videos', ['is_processed'])
+
+def downgrade():
+    op.drop_index('ix_videos_is_processed', table_name='videos')
+    op.drop_index('ix_videos_published_at', table_name='videos')
+    op.drop_index('ix_videos_political_score', table_name='videos')
+    op.drop_index('ix_videos_guest_id_published_at', table_name='videos')
+    op.drop_index('ix_political_segments_video_id_start_time', table_name='political_segments')
+    op.drop_index('ix_transcript_segments_video_id_start_time', table_name='transcript_segments')
@@ -0,0 +1,20 @@
+"""Per-video marker for the full-transcript political segment scan
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('videos', sa.Column('political_scanned_at', sa.DateTime()))
+
+def downgrade():
+    op.drop_column('videos', 'political_scanned_at')
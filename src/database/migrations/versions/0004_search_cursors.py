@@ -0,0 +1,27 @@
+"""Per-keyword search cursors for incremental collection
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'search_cursors',
+        sa.Column('keyword', sa.String(), primary_key=True),
+        sa.Column('published_after', sa.DateTime()),
+        sa.Column('window_end', sa.DateTime()),
+        sa.Column('next_page_token', sa.String()),
+        sa.Column('updated_at', sa.DateTime())
+    )
+
+def downgrade():
+    op.drop_table('search_cursors')
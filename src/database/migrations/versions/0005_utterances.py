@@ -0,0 +1,33 @@
+"""Utterances table and per-video preprocessing marker
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'utterances',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('start_time', sa.Float(), nullable=False),
+        sa.Column('end_time', sa.Float(), nullable=False),
+        sa.Column('segment_count', sa.Integer()),
+        sa.Column('created_at', sa.DateTime())
+    )
+    op.create_index('ix_utterances_video_id_start_time', 'utterances', ['video_id', 'start_time'])
+    op.add_column('videos', sa.Column('preprocessed_at', sa.DateTime()))
+
+def downgrade():
+    op.drop_column('videos', 'preprocessed_at')
+    op.drop_index('ix_utterances_video_id_start_time', table_name='utterances')
+    op.drop_table('utterances')
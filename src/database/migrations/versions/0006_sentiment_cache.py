@@ -0,0 +1,27 @@
+"""Sentiment model result cache keyed by normalized text hash
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'sentiment_cache',
+        sa.Column('model_name', sa.String(), primary_key=True),
+        sa.Column('model_version', sa.String(), primary_key=True),
+        sa.Column('text_hash', sa.String(40), primary_key=True),
+        sa.Column('sentiment_score', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+
+def downgrade():
+    op.drop_table('sentiment_cache')
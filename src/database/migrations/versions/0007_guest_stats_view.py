@@ -0,0 +1,44 @@
+"""Guest statistics materialized view (PostgreSQL only)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Other databases have no materialized views; guest statistics are always queried live there
+        return
+    op.execute("""
+        CREATE MATERIALIZED VIEW guest_stats AS
+        SELECT guests.id AS guest_id,
+               guests.name AS name,
+               appearances.appearance_count,
+               appearances.first_appearance,
+               appearances.last_appearance,
+               appearances.average_political_score
+        FROM (
+            SELECT guest_id,
+                   count(*) AS appearance_count,
+                   min(published_at) AS first_appearance,
+                   max(published_at) AS last_appearance,
+                   avg(political_score) AS average_political_score
+            FROM videos
+            WHERE guest_id IS NOT NULL
+            GROUP BY guest_id
+        ) AS appearances
+        JOIN guests ON guests.id = appearances.guest_id
+    """)
+    # Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index('ix_guest_stats_guest_id', 'guest_stats', ['guest_id'], unique=True)
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP MATERIALIZED VIEW IF EXISTS guest_stats")
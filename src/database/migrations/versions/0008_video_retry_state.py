@@ -0,0 +1,22 @@
+"""Failed attempt count and time for unprocessed videos
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('videos', sa.Column('retry_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('videos', sa.Column('last_attempt_at', sa.DateTime()))
+
+def downgrade():
+    op.drop_column('videos', 'last_attempt_at')
+    op.drop_column('videos', 'retry_count')
@@ -0,0 +1,20 @@
+"""Per-video marker for transcripts written to the raw transcript archive
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('videos', sa.Column('archived_at', sa.DateTime()))
+
+def downgrade():
+    op.drop_column('videos', 'archived_at')
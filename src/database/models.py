@@ -2,7 +2,7 @@
 SQLAlchemy models for the JRE transcript database.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Boolean, Index, DDL, event, table, column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime, UTC
@@ -23,6 +23,12 @@ class Guest(Base):
 
 class Video(Base):
     __tablename__ = 'videos'
+    __table_args__ = (
+        Index('ix_videos_guest_id_published_at', 'guest_id', 'published_at'),
+        Index('ix_videos_political_score', 'political_score'),
+        Index('ix_videos_published_at', 'published_at'),
+        Index('ix_videos_is_processed', 'is_processed'),
+    )
     
     id = Column(Integer, primary_key=True)
     video_id = Column(String, unique=True, nullable=False)
@@ -41,6 +47,11 @@ class Video(Base):
     tags = Column(JSON)  # Store tags as JSON array
     category_id = Column(String)
     is_processed = Column(Boolean, default=False)
+    political_scanned_at = Column(DateTime)  # Set once the transcript has been scanned for political segments
+    preprocessed_at = Column(DateTime)  # Set once the transcript has been merged into utterances
+    archived_at = Column(DateTime)  # Set once the raw transcript has been written to the Parquet archive
+    retry_count = Column(Integer, nullable=False, default=0, server_default='0')  # Failed processing attempts
+    last_attempt_at = Column(DateTime)  # Time of the last failed processing attempt
     created_at = Column(DateTime, default=datetime.now(UTC))
     updated_at = Column(DateTime, default=datetime.now(UTC))
     
@@ -51,9 +62,13 @@ class Video(Base):
     guest = relationship("Guest", back_populates="videos")
     transcript_segments = relationship("TranscriptSegment", back_populates="video", cascade="all, delete-orphan")
     political_segments = relationship("PoliticalSegment", back_populates="video", cascade="all, delete-orphan")
+    utterances = relationship("Utterance", back_populates="video", cascade="all, delete-orphan")
 
 class TranscriptSegment(Base):
     __tablename__ = 'transcript_segments'
+    __table_args__ = (
+        Index('ix_transcript_segments_video_id_start_time', 'video_id', 'start_time'),
+    )
     
     id = Column(Integer, primary_key=True)
     video_id = Column(String, ForeignKey('videos.video_id'), nullable=False)
@@ -67,6 +82,9 @@ class TranscriptSegment(Base):
 
 class PoliticalSegment(Base):
     __tablename__ = 'political_segments'
+    __table_args__ = (
+        Index('ix_political_segments_video_id_start_time', 'video_id', 'start_time'),
+    )
     
     id = Column(Integer, primary_key=True)
     video_id = Column(String, ForeignKey('videos.video_id'), nullable=False)
@@ -79,4 +97,58 @@ class PoliticalSegment(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
     
     # Relationships
-    video = relationship("Video", back_populates="political_segments")
\ No newline at end of file
+    video = relationship("Video", back_populates="political_segments")
+
+class Utterance(Base):
+    """A cleaned, sentence-level utterance merged from consecutive caption lines."""
+    __tablename__ = 'utterances'
+    __table_args__ = (
+        Index('ix_utterances_video_id_start_time', 'video_id', 'start_time'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    video_id = Column(String, ForeignKey('videos.video_id'), nullable=False)
+    text = Column(Text, nullable=False)
+    start_time = Column(Float, nullable=False)
+    end_time = Column(Float, nullable=False)
+    segment_count = Column(Integer)  # Number of caption lines merged into the utterance
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    
+    # Relationships
+    video = relationship("Video", back_populates="utterances")
+
+class SentimentCache(Base):
+    """Sentiment model output for a normalized text, so identical texts are scored once per model."""
+    __tablename__ = 'sentiment_cache'
+    
+    model_name = Column(String, primary_key=True)
+    model_version = Column(String, primary_key=True)
+    text_hash = Column(String(40), primary_key=True)  # sha1 hex digest of the normalized text
+    sentiment_score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+class SearchCursor(Base):
+    __tablename__ = 'search_cursors'
+    
+    keyword = Column(String, primary_key=True)
+    published_after = Column(DateTime)  # High-water mark: everything published before it has been swept
+    window_end = Column(DateTime)  # publishedBefore of the sweep in progress
+    next_page_token = Column(String)  # Page to resume the sweep in progress from
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+# Materialized view of per-guest statistics, created by migration 0007 on PostgreSQL only
+guest_stats = table(
+    'guest_stats',
+    column('guest_id', Integer),
+    column('name', String),
+    column('appearance_count', Integer),
+    column('first_appearance', DateTime),
+    column('last_appearance', DateTime),
+    column('average_political_score', Float)
+)
+
+# The view depends on guests and videos; drop it first so Base.metadata.drop_all keeps working
+event.listen(
+    Base.metadata, 'before_drop',
+    DDL('DROP MATERIALIZED VIEW IF EXISTS guest_stats').execute_if(dialect='postgresql')
+)
@@ -0,0 +1,83 @@
+"""
+Benchmark for create_data_summary: the vectorized archive scan vs. the previous per-segment
+Python loop, on a synthetic transcript archive (100k videos by default) in a temporary directory.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+from collections import defaultdict
+from datetime import datetime, UTC
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Add the data collection directory to the path, as collect_transcripts expects
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_collection'))
+
+from data_collection.transcript_archive import ARCHIVE_SCHEMA, DICTIONARY_COLUMNS
+from collect_transcripts import create_data_summary
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEGMENTS_PER_VIDEO = 100
+VIDEOS_PER_FILE = 5000
+
+def write_archive(archive_dir: str, video_count: int):
+    """Write a synthetic archive with SEGMENTS_PER_VIDEO caption lines per video."""
+    rng = np.random.default_rng(0)
+    fetch_date = datetime.now(UTC)
+    texts = pa.array([f"caption line number {i} with a few more words" for i in range(SEGMENTS_PER_VIDEO)])
+    for first in range(0, video_count, VIDEOS_PER_FILE):
+        count = min(VIDEOS_PER_FILE, video_count - first)
+        year = 2017 + (first // VIDEOS_PER_FILE) % 8
+        video_ids = np.repeat([f"bench_{first + i}" for i in range(count)], SEGMENTS_PER_VIDEO)
+        starts = np.tile(np.arange(SEGMENTS_PER_VIDEO) * 2.5, count)
+        table = pa.Table.from_pydict({
+            'video_id': video_ids,
+            'start': starts,
+            'duration': rng.uniform(1.0, 4.0, count * SEGMENTS_PER_VIDEO),
+            'text': pa.concat_arrays([texts] * count),
+            'title': np.repeat([f"Benchmark video {first + i}" for i in range(count)], SEGMENTS_PER_VIDEO),
+            'published_at': pa.array([datetime(year, 6, 1, tzinfo=UTC)] * (count * SEGMENTS_PER_VIDEO), ARCHIVE_SCHEMA.field('published_at').type),
+            'fetch_date': pa.array([fetch_date] * (count * SEGMENTS_PER_VIDEO), ARCHIVE_SCHEMA.field('fetch_date').type)
+        }, schema=ARCHIVE_SCHEMA)
+        partition_dir = os.path.join(archive_dir, f"year={year}")
+        os.makedirs(partition_dir, exist_ok=True)
+        pq.write_table(table, os.path.join(partition_dir, f"part-{first}.parquet"),
+                       compression='zstd', use_dictionary=DICTIONARY_COLUMNS)
+
+def loop_summary(archive_dir: str):
+    """The previous approach: a Python loop over every segment."""
+    totals = defaultdict(lambda: [0.0, 0])
+    dataset = ds.dataset(archive_dir, format='parquet', partitioning='hive')
+    for batch in dataset.to_batches(columns=['video_id', 'duration', 'text']):
+        for segment in batch.to_pylist():
+            total = totals[segment['video_id']]
+            total[0] += segment['duration']
+            total[1] += len(segment['text'].split())
+    return totals
+
+def main(video_count: int = 100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_dir = os.path.join(tmp, 'raw_transcripts')
+        logging.info(f"Writing a synthetic archive of {video_count} videos ({video_count * SEGMENTS_PER_VIDEO} segments)...")
+        write_archive(archive_dir, video_count)
+
+        start = time.perf_counter()
+        create_data_summary(archive_dir)
+        vectorized = time.perf_counter() - start
+        logging.info(f"Vectorized summary: {vectorized:.2f}s")
+
+        start = time.perf_counter()
+        loop_summary(archive_dir)
+        loop = time.perf_counter() - start
+        logging.info(f"Per-segment loop: {loop:.2f}s ({loop / vectorized:.1f}x slower)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
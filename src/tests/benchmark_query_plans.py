@@ -0,0 +1,121 @@
+"""
+Benchmark for the hot query paths: query plans and timings with and without the indexes from
+migration 0002. Seeds a synthetic corpus (10M transcript segments by default) into the PostgreSQL
+database in DATABASE_URL, so point it at a scratch database.
+"""
+
+import os
+import sys
+import logging
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from database.db_manager import DatabaseManager
+from database.models import Video, TranscriptSegment, PoliticalSegment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEGMENTS_PER_VIDEO = 5000
+POLITICAL_SEGMENTS_PER_VIDEO = 50
+GUEST_COUNT = 500
+
+# The queries behind get_transcript_segments, get_political_segments, get_videos_by_guest,
+# get_political_videos and the quality report counts
+HOT_QUERIES = {
+    'get_transcript_segments': """
+        SELECT * FROM transcript_segments
+        WHERE video_id = :video_id ORDER BY start_time
+    """,
+    'get_political_segments': """
+        SELECT * FROM political_segments
+        WHERE video_id = :video_id ORDER BY start_time
+    """,
+    'get_videos_by_guest': """
+        SELECT * FROM videos
+        WHERE guest_id = (SELECT id FROM guests WHERE name = 'bench guest 7') ORDER BY published_at
+    """,
+    'get_political_videos': """
+        SELECT * FROM videos WHERE political_score >= 0.95 ORDER BY political_score DESC
+    """,
+    'processed_video_count': """
+        SELECT count(*) FROM videos WHERE is_processed = true
+    """
+}
+
+INDEXED_TABLES = [Video.__table__, TranscriptSegment.__table__, PoliticalSegment.__table__]
+
+def seed_corpus(db: DatabaseManager, segment_count: int):
+    """Insert synthetic guests, videos and segments unless a large enough corpus is already present."""
+    video_count = max(1, segment_count // SEGMENTS_PER_VIDEO)
+    with db.engine.begin() as connection:
+        existing = connection.execute(
+            text("SELECT count(*) FROM videos WHERE video_id LIKE 'bench\\_%'")
+        ).scalar()
+        if existing >= video_count:
+            logging.info(f"Reusing existing benchmark corpus of {existing} videos")
+            return
+
+        logging.info(f"Seeding {video_count} videos and {video_count * SEGMENTS_PER_VIDEO} transcript segments...")
+        connection.execute(text("""
+            INSERT INTO guests (name)
+            SELECT 'bench guest ' || g FROM generate_series(1, :guests) g
+            ON CONFLICT DO NOTHING
+        """), {'guests': GUEST_COUNT})
+        connection.execute(text("""
+            INSERT INTO videos (video_id, title, published_at, political_score, is_processed, guest_id)
+            SELECT 'bench_' || v, 'Benchmark video ' || v,
+                   timestamp '2017-01-01' + v * interval '1 hour', random(), v % 2 = 0, g.id
+            FROM generate_series(1, :videos) v
+            JOIN guests g ON g.name = 'bench guest ' || (v % :guests + 1)
+        """), {'videos': video_count, 'guests': GUEST_COUNT})
+        connection.execute(text("""
+            INSERT INTO transcript_segments (video_id, text, start_time, duration)
+            SELECT 'bench_' || v, 'benchmark caption line ' || s, s * 2.5, 2.5
+            FROM generate_series(1, :videos) v, generate_series(1, :per_video) s
+        """), {'videos': video_count, 'per_video': SEGMENTS_PER_VIDEO})
+        connection.execute(text("""
+            INSERT INTO political_segments (video_id, segment_text, start_time, end_time)
+            SELECT 'bench_' || v, 'benchmark political segment ' || s, s * 60.0, s * 60.0 + 30.0
+            FROM generate_series(1, :videos) v, generate_series(1, :per_video) s
+        """), {'videos': video_count, 'per_video': POLITICAL_SEGMENTS_PER_VIDEO})
+
+def set_indexes(db: DatabaseManager, enabled: bool):
+    """Create or drop the hot-path indexes declared on the models, then refresh planner statistics."""
+    with db.engine.begin() as connection:
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.drop(connection, checkfirst=True)
+                if enabled:
+                    index.create(connection)
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+def explain_queries(db: DatabaseManager, label: str, video_id: str):
+    """Log the scan nodes and execution time of each hot query."""
+    with db.engine.connect() as connection:
+        for name, query in HOT_QUERIES.items():
+            plan = [row[0] for row in connection.execute(text(f"EXPLAIN ANALYZE {query}"), {'video_id': video_id})]
+            scans = [line.strip(' ->').split('  (')[0] for line in plan if 'Scan' in line]
+            execution_time = next(line for line in plan if line.startswith('Execution Time'))
+            logging.info(f"[{label}] {name}: {'; '.join(scans) or plan[0].strip()} | {execution_time}")
+
+def main(segment_count: int = 10_000_000):
+    db = DatabaseManager()
+    if db.engine.dialect.name != 'postgresql':
+        logging.error("The query plan benchmark requires PostgreSQL")
+        return
+    db.init_db()
+    seed_corpus(db, segment_count)
+    video_id = f"bench_{max(1, segment_count // SEGMENTS_PER_VIDEO // 2)}"
+
+    try:
+        set_indexes(db, enabled=False)
+        explain_queries(db, "without indexes", video_id)
+    finally:
+        set_indexes(db, enabled=True)
+    explain_queries(db, "with indexes", video_id)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,84 @@
+"""
+Benchmark for transcript segment ingestion: bulk add_transcript_segments vs. the per-row ORM loop.
+Runs against the database in DATABASE_URL.
+"""
+
+import os
+import sys
+import time
+import logging
+from datetime import datetime, UTC
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager
+from database.models import TranscriptSegment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BENCHMARK_VIDEO_ID = "benchmark_ingest"
+
+def make_segments(count: int):
+    """Build synthetic caption lines shaped like YouTube transcript entries."""
+    return [
+        {
+            'text': f"segment {i} of the benchmark transcript, with some\ttabs and \\ backslashes",
+            'start': i * 2.5,
+            'duration': 2.5
+        }
+        for i in range(count)
+    ]
+
+def orm_insert(db: DatabaseManager, video_id: str, segments):
+    """The previous implementation: one ORM object and session.add per segment."""
+    session = db.Session()
+    try:
+        for segment_data in segments:
+            session.add(TranscriptSegment(
+                video_id=video_id,
+                text=segment_data['text'],
+                start_time=segment_data['start'],
+                duration=segment_data['duration']
+            ))
+        session.commit()
+    finally:
+        session.close()
+    return len(segments)
+
+def run_benchmark(db: DatabaseManager, name: str, insert_func, segments, rounds: int):
+    """Insert the segments `rounds` times and log the throughput."""
+    elapsed = 0.0
+    rows = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        rows += insert_func(db, BENCHMARK_VIDEO_ID, segments)
+        elapsed += time.perf_counter() - start
+    logging.info(f"{name}: {rows} segments in {elapsed:.2f}s ({rows / elapsed:,.0f} segments/sec)")
+    return rows / elapsed
+
+def main(segment_count: int = 5000, rounds: int = 20):
+    db = DatabaseManager()
+    db.init_db()
+    db.delete_video(BENCHMARK_VIDEO_ID)
+    db.add_video({
+        'video_id': BENCHMARK_VIDEO_ID,
+        'title': 'Segment ingestion benchmark',
+        'published_at': datetime.now(UTC),
+        'channel_title': 'benchmark'
+    })
+    segments = make_segments(segment_count)
+    
+    try:
+        orm_rate = run_benchmark(db, "ORM loop", orm_insert, segments, rounds)
+        bulk_rate = run_benchmark(
+            db, "Bulk ingest",
+            lambda db, video_id, segments: db.add_transcript_segments(video_id, segments),
+            segments, rounds
+        )
+        logging.info(f"Speedup: {bulk_rate / orm_rate:.1f}x")
+    finally:
+        db.delete_video(BENCHMARK_VIDEO_ID)
+
+if __name__ == "__main__":
+    main()
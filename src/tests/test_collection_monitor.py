@@ -0,0 +1,68 @@
+"""
+Tests for replaying the collection statistics journal and compacting it into a snapshot.
+"""
+
+import os
+import sys
+import shutil
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.collection_monitor import CollectionMonitor
+
+VIDEO = SimpleNamespace(published_at=datetime(2020, 5, 1), political_categories=['core_politics'])
+
+def make_monitor(logs_dir, **kwargs) -> CollectionMonitor:
+    kwargs.setdefault('batch_size', 1)
+    return CollectionMonitor(None, logs_dir=str(logs_dir), **kwargs)
+
+def record_videos(monitor: CollectionMonitor, count: int):
+    for i in range(count):
+        monitor.update_video_processed(f"video{i}", True, segment_count=10, processing_time=1.0,
+                                       video=VIDEO, guest_name='Guest')
+    monitor.flush()
+
+def test_journal_is_replayed(tmp_path):
+    record_videos(make_monitor(tmp_path), 3)
+    stats = make_monitor(tmp_path).stats
+    assert stats['processed_videos'] == 3
+    assert stats['total_segments'] == 30
+    assert stats['videos_by_guest']['Guest'] == 3
+
+def test_crash_during_compaction_is_not_double_counted(tmp_path):
+    monitor = make_monitor(tmp_path)
+    record_videos(monitor, 3)
+
+    # Crash after the snapshot was written but before the journal was replaced
+    shutil.copy(monitor.journal_file, str(tmp_path / 'journal.bak'))
+    monitor._compact()
+    shutil.copy(str(tmp_path / 'journal.bak'), monitor.journal_file)
+
+    monitor = make_monitor(tmp_path)
+    assert monitor.stats['processed_videos'] == 3
+    # Events journaled after the crash are kept
+    record_videos(monitor, 2)
+    assert make_monitor(tmp_path).stats['processed_videos'] == 5
+
+def test_compaction_keeps_events_of_other_writers(tmp_path):
+    fetcher = make_monitor(tmp_path, compact_every=5)
+    preprocessing = make_monitor(tmp_path, compact_every=5)
+    record_videos(preprocessing, 2)
+    # The fetcher compacts without having seen the other writer's events
+    record_videos(fetcher, 5)
+    assert fetcher.stats['processed_videos'] == 7
+    record_videos(preprocessing, 1)
+
+    stats = make_monitor(tmp_path).stats
+    assert stats['processed_videos'] == 8
+    assert stats['total_segments'] == 80
+
+def test_truncated_journal_line_is_ignored(tmp_path):
+    monitor = make_monitor(tmp_path)
+    record_videos(monitor, 2)
+    with open(monitor.journal_file, 'a') as f:
+        f.write('{"type": "video_proc')
+    assert make_monitor(tmp_path).stats['processed_videos'] == 2
@@ -0,0 +1,47 @@
+"""
+Tests for the precompiled political keyword matcher.
+"""
+
+import os
+import re
+import sys
+import random
+from collections import Counter
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.keyword_matcher import KeywordMatcher, POLITICAL_KEYWORDS
+
+def naive_match_keywords(text: str) -> Counter:
+    """Count each keyword with its own regex, as the matcher is specified to."""
+    counts = Counter()
+    for keywords in POLITICAL_KEYWORDS.values():
+        for keyword in keywords:
+            keyword = keyword.lower()
+            pattern = r'\s+'.join(re.escape(word) for word in keyword.split())
+            count = len(re.findall(rf"\b{pattern}s?\b", text, re.IGNORECASE))
+            if count:
+                counts[keyword] = count
+    return counts
+
+def test_matches_naive_regex():
+    """The single trie regex counts the same keywords as one regex per keyword."""
+    matcher = KeywordMatcher(POLITICAL_KEYWORDS)
+    words = [word for keywords in POLITICAL_KEYWORDS.values() for keyword in keywords for word in keyword.split()]
+    words += ["the", "warehouse", "trumpet", "politically", "left", "wings", "Policy", "HOUSES", "s", "-", "."]
+    rng = random.Random(0)
+    for _ in range(500):
+        text = ''.join(
+            rng.choice(words) + rng.choice([' ', '  ', '\n', ', ', '', 's '])
+            for _ in range(rng.randint(1, 30))
+        )
+        assert matcher.match_keywords(text) == naive_match_keywords(text), text
+
+def test_match_groups_by_category():
+    matcher = KeywordMatcher(POLITICAL_KEYWORDS)
+    matches = matcher.match("Trump and Biden on identity politics and the warehouse")
+    assert matches['political_figures'] == Counter({'trump': 1, 'biden': 1})
+    assert matches['cultural_issues'] == Counter({'identity politics': 1})
+    assert matches['core_politics'] == Counter({'politics': 1})
+    assert 'house' not in matcher.match_keywords("the warehouse")
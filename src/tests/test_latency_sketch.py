@@ -0,0 +1,86 @@
+"""
+Tests for the mergeable percentile sketch used for stage processing times.
+"""
+
+import os
+import sys
+import math
+import random
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.latency_sketch import LatencySketch
+
+QUANTILES = [0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999, 1]
+
+def exact_quantile(values: list, q: float) -> float:
+    """The value the sketch approximates: the one at rank q * (n - 1), rounded down."""
+    values = sorted(values)
+    return values[math.floor(q * (len(values) - 1))]
+
+def processing_times(seed: int, count: int) -> list:
+    rng = random.Random(seed)
+    # Heavy-tailed, from milliseconds to minutes, like per-video stage times
+    return [rng.lognormvariate(0, 2) for _ in range(count)]
+
+@pytest.mark.parametrize('relative_accuracy', [0.01, 0.05])
+def test_quantiles_within_relative_accuracy(relative_accuracy):
+    values = processing_times(0, 20000)
+    sketch = LatencySketch(relative_accuracy)
+    for value in values:
+        sketch.add(value)
+    for q in QUANTILES:
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= relative_accuracy * exact * (1 + 1e-9), q
+    assert sketch.count == len(values)
+    assert sketch.min == min(values)
+    assert sketch.max == max(values)
+
+def test_values_below_min_value_count_as_zero():
+    sketch = LatencySketch()
+    for value in [0.0, 0.0, 0.0, 1.0]:
+        sketch.add(value)
+    assert sketch.zero_count == 3
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1) == pytest.approx(1.0, rel=0.01)
+    assert LatencySketch().quantile(0.5) is None
+
+def test_merge_equals_sketch_of_all_values():
+    parts = [processing_times(seed, 5000) for seed in range(4)]
+    merged = LatencySketch()
+    for values in parts:
+        sketch = LatencySketch()
+        for value in values:
+            sketch.add(value)
+        # Sketches are sent between processes as dicts
+        merged.merge(LatencySketch.from_dict(sketch.to_dict()))
+
+    whole = LatencySketch()
+    for values in parts:
+        for value in values:
+            whole.add(value)
+
+    assert merged.buckets == whole.buckets
+    assert merged.count == whole.count
+    assert merged.sum == pytest.approx(whole.sum)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    for q in QUANTILES:
+        assert merged.quantile(q) == whole.quantile(q)
+
+    with pytest.raises(ValueError):
+        merged.merge(LatencySketch(relative_accuracy=0.05))
+
+def test_collapsing_keeps_the_tail_accurate():
+    values = processing_times(1, 20000)
+    sketch = LatencySketch(max_buckets=300)
+    for value in values:
+        sketch.add(value)
+    # The values span about 800 buckets; the lowest ones are collapsed
+    assert len(sketch.buckets) == 300
+    assert sketch.quantile(0.01) > 1.01 * exact_quantile(values, 0.01)
+    for q in [0.95, 0.99, 1]:
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact * (1 + 1e-9), q
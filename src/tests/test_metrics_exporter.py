@@ -0,0 +1,37 @@
+"""
+Tests for the per-thread cells of the embedded metrics exporter.
+"""
+
+import os
+import sys
+import threading
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.metrics_exporter import MetricsExporter
+
+def run_threads(exporter: MetricsExporter, count: int):
+    def work():
+        exporter.inc('jre_videos_ingested_total')
+        exporter.inc('jre_errors_total', type='transcript_error')
+        exporter.observe('jre_stage_seconds', 0.2, stage='total')
+    threads = [threading.Thread(target=work) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_cells_of_finished_threads_are_retired():
+    exporter = MetricsExporter()
+    run_threads(exporter, 50)
+    run_threads(exporter, 50)
+    assert exporter.cells == []
+
+    exporter.inc('jre_videos_ingested_total')
+    assert len(exporter.cells) == 1
+    text = exporter.render()
+    assert 'jre_videos_ingested_total 101\n' in text
+    assert 'jre_errors_total{type="transcript_error"} 100\n' in text
+    assert 'jre_stage_seconds_bucket{stage="total",le="0.25"} 100\n' in text
+    assert 'jre_stage_seconds_count{stage="total"} 100\n' in text
@@ -0,0 +1,96 @@
+"""
+Tests for the token bucket and the adaptive (AIMD) rate limiter.
+"""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection import rate_limiter
+from data_collection.rate_limiter import AdaptiveRateLimiter, TokenBucket
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic() instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class TooManyRequests(Exception):
+    pass
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with mock.patch.object(rate_limiter, 'time', fake):
+        yield fake
+
+def test_token_bucket_paces_requests(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2.0)
+    # The bucket starts full: a burst of capacity requests does not wait
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    # Then requests are spaced 1 / rate apart
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+    # Idle time refills the bucket, but never above capacity
+    clock.now += 10
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+def test_limit_grows_additively_and_halves_on_throttle(clock):
+    limiter = AdaptiveRateLimiter({'search': 100.0}, max_concurrency=8, max_attempts=3)
+    for _ in range(20):
+        limiter.call('search', lambda: None)
+    grown = limiter.get_metrics()['search']['concurrency_limit']
+    assert 1.0 < grown <= 8
+
+    attempts = []
+    def throttled_once():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TooManyRequests()
+        return 'ok'
+
+    assert limiter.call('search', throttled_once) == 'ok'
+    metrics = limiter.get_metrics()['search']
+    assert metrics['throttles'] == 1
+    assert metrics['in_flight'] == 0
+    # Halved by the throttle, then raised once by the successful retry
+    assert metrics['concurrency_limit'] == pytest.approx(grown / 2 + 1 / (grown / 2))
+    assert len(clock.slept) == 1
+
+def test_throttles_are_retried_until_max_attempts(clock):
+    limiter = AdaptiveRateLimiter({'transcript': 100.0}, max_attempts=3)
+    calls = []
+    def always_throttled():
+        calls.append(1)
+        raise TooManyRequests()
+
+    with pytest.raises(TooManyRequests):
+        limiter.call('transcript', always_throttled)
+    assert len(calls) == 3
+    assert limiter.get_metrics()['transcript']['concurrency_limit'] == 1.0
+
+    # Other errors are not retried
+    calls.clear()
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+    with pytest.raises(ValueError):
+        limiter.call('transcript', broken)
+    assert len(calls) == 1
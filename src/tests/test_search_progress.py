@@ -0,0 +1,61 @@
+"""
+Tests for saving search cursors once result pages have been processed.
+"""
+
+import os
+import sys
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.search_progress import SearchProgress
+
+def add_page(progress: SearchProgress, saved: list, keyword: str, name: str, video_ids: list) -> dict:
+    page = progress.add_page(keyword, lambda: saved.append(name))
+    for video_id in video_ids:
+        progress.add_video(page, video_id)
+    progress.close_page(page)
+    return page
+
+def test_pages_finished_out_of_order_are_saved_in_order():
+    progress = SearchProgress()
+    saved = []
+    add_page(progress, saved, 'trump', 'page1', ['a', 'b'])
+    add_page(progress, saved, 'trump', 'page2', ['c'])
+    add_page(progress, saved, 'trump', 'page3', ['d'])
+
+    # Page 2 and 3 finish first, but must wait for page 1
+    progress.video_done('c')
+    progress.video_done('d')
+    progress.video_done('a')
+    assert saved == []
+    progress.video_done('b')
+    assert saved == ['page1', 'page2', 'page3']
+
+def test_keywords_are_independent():
+    progress = SearchProgress()
+    saved = []
+    add_page(progress, saved, 'trump', 'trump1', ['a'])
+    add_page(progress, saved, 'biden', 'biden1', ['b'])
+    progress.video_done('b')
+    assert saved == ['biden1']
+    progress.video_done('a')
+    assert saved == ['biden1', 'trump1']
+
+def test_page_is_saved_only_once_closed():
+    progress = SearchProgress()
+    saved = []
+    page = progress.add_page('trump', lambda: saved.append('page1'))
+    progress.add_video(page, 'a')
+    progress.video_done('a')
+    # More videos of the page may still be emitted
+    assert saved == []
+    progress.close_page(page)
+    assert saved == ['page1']
+
+    # Pages without relevant videos are saved as soon as they are closed
+    add_page(progress, saved, 'trump', 'page2', [])
+    assert saved == ['page1', 'page2']
+    # Videos that do not come from a tracked page are ignored
+    progress.video_done('unknown')
+    assert saved == ['page1', 'page2']